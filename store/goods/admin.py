@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.text import slugify
 from .models import Category, Product
+from .search import get_search_backend
 
 
 @admin.register(Category)
@@ -53,7 +54,9 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'code', 'category', 'main_image_preview', 'images_count')
+    list_display = ('name', 'code', 'category', 'stock_in_store', 'availability', 'main_image_preview', 'images_count')
+    list_select_related = ('category', 'stock_summary')
+    search_fields = ('name', 'code')
     readonly_fields = ('main_image_preview', 'images_list')
     fieldsets = (
         ('Основная информация', {
@@ -68,6 +71,12 @@ class ProductAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск через полнотекстовый индекс вместо icontains по всей таблице
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
+
     def main_image_preview(self, obj):
         main_image = obj.product_images.filter(is_main=True).first()
         if main_image:
@@ -91,6 +100,17 @@ class ProductAdmin(admin.ModelAdmin):
         return "Нет изображений"
     images_list.short_description = 'Все изображения'
 
+    # Остатки из unit.StockSummary - одна строка на товар в том же JOIN
+    def stock_in_store(self, obj):
+        summary = getattr(obj, 'stock_summary', None)
+        return summary.in_store if summary else 0
+    stock_in_store.short_description = 'В магазине'
+    stock_in_store.admin_order_field = 'stock_summary__in_store'
+
+    def availability(self, obj):
+        return obj.get_availability_status()
+    availability.short_description = 'Наличие'
+
     def images_count(self, obj):
         return obj.product_images.count()
     images_count.short_description = 'Изобр.'
\ No newline at end of file
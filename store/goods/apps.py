@@ -3,4 +3,9 @@ from django.apps import AppConfig
 class GoodsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'goods'
-    label = 'goods'
\ No newline at end of file
+    label = 'goods'
+
+    def ready(self):
+        # Сигналы ведут журнал удалений для ленты изменений
+        # и поддерживают поисковый индекс товаров
+        import goods.signals
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+
+def fill_category_paths(apps, schema_editor):
+    """Строит материализованные пути для уже существующих категорий"""
+    Category = apps.get_model('goods', 'Category')
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def build(category_id, seen=()):
+        if category_id in paths:
+            return paths[category_id]
+        parent_id = parents[category_id]
+        # Циклы в старых данных разрываем: такая категория становится корневой
+        if parent_id is None or parent_id in seen or parent_id not in parents:
+            prefix = ''
+        else:
+            prefix = build(parent_id, seen + (category_id,))
+        paths[category_id] = f'{prefix}{category_id}/'
+        return paths[category_id]
+
+    for category_id in parents:
+        Category.objects.filter(pk=category_id).update(path=build(category_id))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0004_category_updated_at_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, verbose_name='Путь в дереве'),
+        ),
+        migrations.RunPython(fill_category_paths, migrations.RunPython.noop),
+    ]
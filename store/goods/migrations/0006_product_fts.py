@@ -0,0 +1,47 @@
+from django.db import OperationalError, migrations, transaction
+
+
+def normalize_text(text):
+    # Та же нормализация, что в goods.search.normalize_text
+    return (text or '').replace('ё', 'е').replace('Ё', 'Е')
+
+
+def create_product_fts(apps, schema_editor):
+    """Полнотекстовый индекс товаров (только SQLite с FTS5)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE goods_product_fts USING fts5("
+                "name, code, description, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+    except OperationalError:
+        # SQLite собран без FTS5: таблицы нет, работает BasicSearchBackend
+        return
+    Product = apps.get_model('goods', 'Product')
+    rows = Product.objects.values_list('id', 'name', 'code', 'description').iterator()
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO goods_product_fts (rowid, name, code, description) VALUES (%s, %s, %s, %s)",
+            [(pk, normalize_text(name), normalize_text(code), normalize_text(description))
+             for pk, name, code, description in rows]
+        )
+
+
+def drop_product_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS goods_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0005_category_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_product_fts, drop_product_fts),
+    ]
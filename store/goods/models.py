@@ -1,5 +1,8 @@
 # app goods/models
-from django.db import models
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from django.utils.text import slugify
 
@@ -19,20 +22,91 @@ class Category(models.Model):
         blank=True,
         null=True
     )
+    # Материализованный путь: id предков и самой категории через '/',
+    # например '1/5/12/'. Поддерево - один диапазон по индексу.
+    path = models.CharField(
+        'Путь в дереве',
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата последнего обновления'
+    )
 
     class Meta:
         app_label = 'goods'
         verbose_name = 'Категория товара'
         verbose_name_plural = 'Категории товаров'
         ordering = ['name']
+        indexes = [
+            # Ключ keyset-пагинации API
+            models.Index(fields=['name', 'id']),
+            # Лента изменений: выборка "изменено после"
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def subtree_q(path, prefix=''):
+        """
+        Условие "путь начинается с path" в виде диапазона
+        path <= x < path без '/' + '0' ('0' следует за '/' в ASCII),
+        чтобы БД использовала индекс, а не LIKE.
+        prefix - путь к полю из другой модели, например 'category__'.
+        """
+        return Q(**{
+            f'{prefix}path__gte': path,
+            f'{prefix}path__lt': path[:-1] + '0',
+        })
+
+    def get_descendants(self, include_self=True):
+        """Все категории поддерева одним запросом"""
+        descendants = Category.objects.filter(Category.subtree_q(self.path))
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
+
+    def _parent_path(self):
+        if not self.parent_id:
+            return ''
+        # Путь родителя читаем из БД: объект в памяти мог устареть
+        return Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+
+    def clean(self):
+        if self.pk and self.parent_id:
+            if self.parent_id == self.pk or (
+                self.path and self._parent_path().startswith(self.path)
+            ):
+                raise ValidationError({'parent': 'Категория не может быть вложена сама в себя'})
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+
+        old_path = self.path
+        parent_path = self._parent_path()
+        if old_path and parent_path.startswith(old_path):
+            raise ValidationError('Категория не может быть вложена сама в себя')
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            new_path = f'{parent_path}{self.pk}/'
+            if new_path != old_path:
+                Category.objects.filter(pk=self.pk).update(path=new_path)
+                if old_path:
+                    # Перенос поддерева: меняем префикс у всех потомков одним UPDATE
+                    Category.objects.filter(
+                        Category.subtree_q(old_path)
+                    ).exclude(pk=self.pk).update(
+                        path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                        updated_at=timezone.now()
+                    )
+                self.path = new_path
 
 
 class Product(models.Model):
@@ -75,18 +149,65 @@ class Product(models.Model):
         verbose_name = 'Товар'
         verbose_name_plural = 'Товары'
         ordering = ['name']
+        indexes = [
+            # Ключ keyset-пагинации API, совпадает с ordering
+            models.Index(fields=['name', 'id']),
+            # Лента изменений: выборка "изменено после"
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
 
     def get_availability_status(self) -> str:
         """
-        Возвращает статус доступности товара
-        (заглушка - нужно реализовать логику)
+        Возвращает статус доступности товара по счётчикам остатков
+        (unit.StockSummary), без подсчёта единиц
         """
-        return "В наличии"
+        try:
+            summary = self.stock_summary
+        except ObjectDoesNotExist:
+            summary = None
+        if summary is not None and summary.in_store > 0:
+            return "В наличии"
+        if summary is not None and summary.in_request > 0:
+            return "Ожидается поставка"
+        return "Нет в наличии"
 
     @property
     def images(self):
         """Возвращает все изображения товара"""
-        return self.product_images.all()
\ No newline at end of file
+        return self.product_images.all()
+
+
+class Tombstone(models.Model):
+    """
+    Отметка об удалении товара или категории.
+    Нужна ленте изменений: удалённую строку по updated_at уже не найти.
+    """
+    OBJECT_TYPES = [
+        ('product', 'Товар'),
+        ('category', 'Категория'),
+    ]
+
+    object_type = models.CharField(
+        'Тип объекта',
+        max_length=10,
+        choices=OBJECT_TYPES
+    )
+    object_id = models.BigIntegerField('ID объекта')
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        default=timezone.now
+    )
+
+    class Meta:
+        app_label = 'goods'
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+        indexes = [
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_object_type_display()} #{self.object_id} удалён {self.deleted_at}"
@@ -0,0 +1,87 @@
+# app goods/pagination
+"""
+Keyset-пагинация (по курсору) для списков API.
+
+Вместо OFFSET следующая страница выбирается условием
+(name, id) > (последнее name, последний id), поэтому стоимость запроса
+одинакова для первой и для тысячной страницы при наличии индекса (name, id).
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не соответствует ключу сортировки"""
+
+
+def encode_cursor(values):
+    """Упаковывает значения ключа последней строки в непрозрачную строку"""
+    raw = json.dumps(values, separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Распаковывает курсор обратно в список значений ключа"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise InvalidCursor('Некорректный курсор')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Некорректный курсор')
+    return values
+
+
+def get_page_size(request):
+    """Размер страницы из ?limit=, ограниченный MAX_PAGE_SIZE"""
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidCursor('limit должен быть целым числом')
+    if limit <= 0:
+        raise InvalidCursor('limit должен быть положительным')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def wants_pagination(request):
+    """Клиент явно запросил постраничную выдачу"""
+    return 'cursor' in request.GET or 'limit' in request.GET
+
+
+def _key_value(row, key):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+def paginate_keyset(queryset, request, keys=('name', 'id')):
+    """
+    Возвращает (строки страницы, курсор следующей страницы или None).
+    Строки - словари .values() или модели; поля ключа должны быть загружены.
+    """
+    limit = get_page_size(request)
+    queryset = queryset.order_by(*keys)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        # (k1, k2) > (v1, v2)  ==  k1 > v1 OR (k1 = v1 AND k2 > v2)
+        condition = Q()
+        for i, key in enumerate(keys):
+            step = Q(**{f'{key}__gt': values[i]})
+            for prev_key, prev_value in zip(keys[:i], values[:i]):
+                step &= Q(**{prev_key: prev_value})
+            condition |= step
+        queryset = queryset.filter(condition)
+
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([_key_value(rows[-1], key) for key in keys])
+    return rows, next_cursor
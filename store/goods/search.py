@@ -0,0 +1,130 @@
+# app goods/search
+"""
+Полнотекстовый поиск товаров.
+
+На SQLite используется виртуальная таблица FTS5 goods_product_fts
+(rowid = id товара), которая повторяет name/code/description и
+поддерживается сигналами post_save/post_delete. Если FTS5 недоступен
+(другая СУБД или таблица не создана), работает запасной бэкенд с icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'goods_product_fts'
+
+# Веса столбцов для bm25: совпадение по коду важнее, чем по описанию
+FTS_WEIGHTS = {'name': 5.0, 'code': 10.0, 'description': 1.0}
+
+_backend = None
+
+
+def normalize_text(text):
+    """unicode61 не сводит 'ё' к 'е' - делаем это сами и в индексе, и в запросе"""
+    return (text or '').replace('ё', 'е').replace('Ё', 'Е')
+
+
+def build_match_query(query):
+    """
+    Превращает пользовательскую строку в выражение FTS5:
+    каждое слово - префиксный поиск, слова объединяются по И.
+    'RF-755 ключ' -> '"rf"* "755"* "ключ"*'
+    """
+    tokens = re.findall(r'\w+', normalize_text(query).lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class BasicSearchBackend:
+    """Поиск без индекса: icontains по названию и коду"""
+
+    def index(self, products):
+        pass
+
+    def remove(self, product_ids):
+        pass
+
+    def filter(self, queryset, query, prefix=''):
+        condition = Q()
+        for token in query.split():
+            condition &= (
+                Q(**{f'{prefix}name__icontains': token}) |
+                Q(**{f'{prefix}code__icontains': token})
+            )
+        return queryset.filter(condition)
+
+    def search(self, query, limit):
+        from .models import Product
+        return list(
+            self.filter(Product.objects.all(), query).values_list('id', flat=True)[:limit]
+        )
+
+
+class FTS5SearchBackend(BasicSearchBackend):
+    """Поиск через виртуальную таблицу SQLite FTS5"""
+
+    def index(self, products):
+        products = list(products)
+        if not products:
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, [product.pk for product in products])
+            # Многострочный VALUES через execute, а не executemany: панель SQL
+            # debug_toolbar не умеет выводить executemany на SQLite.
+            # 200 строк - 800 параметров, в пределах ограничения SQLite
+            for start in range(0, len(products), 200):
+                chunk = products[start:start + 200]
+                params = []
+                for p in chunk:
+                    params += [p.pk, normalize_text(p.name), normalize_text(p.code), normalize_text(p.description)]
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, name, code, description) VALUES '
+                    + ', '.join(['(%s, %s, %s, %s)'] * len(chunk)),
+                    params
+                )
+
+    def remove(self, product_ids):
+        product_ids = list(product_ids)
+        if product_ids:
+            with connection.cursor() as cursor:
+                self._delete(cursor, product_ids)
+
+    def _delete(self, cursor, product_ids):
+        # Ограничение SQLite на число параметров в одном запросе
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+    def filter(self, queryset, query, prefix=''):
+        match = build_match_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(**{
+            f'{prefix}pk__in': RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        })
+
+    def search(self, query, limit):
+        match = build_match_query(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_search_backend():
+    """Бэкенд выбирается один раз на процесс по наличию таблицы FTS5"""
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            _backend = FTS5SearchBackend()
+        else:
+            _backend = BasicSearchBackend()
+    return _backend
@@ -0,0 +1,89 @@
+# app goods/serializers
+"""
+Проекция товаров для API: ?fields= (какие колонки отдавать) и
+?expand=category,images,stock (связанные данные в том же ответе).
+
+Без expand выборка идёт через .values(*fields) - без создания моделей
+и без лишних колонок. С expand - через .only() + select_related/prefetch_related,
+поэтому число запросов не зависит от количества товаров.
+"""
+from django.db.models import Prefetch
+
+from files.models import ProductImage
+
+PRODUCT_FIELDS = ('id', 'code', 'name', 'description', 'category_id', 'created_at', 'updated_at')
+PRODUCT_EXPANSIONS = ('category', 'images', 'stock')
+STOCK_FIELDS = ('in_store', 'in_request')
+
+
+class InvalidQuery(ValueError):
+    """Неизвестное поле в ?fields= или ?expand="""
+
+
+def _parse_list(request, param, allowed, default):
+    raw = request.GET.get(param)
+    if not raw:
+        return default
+    values = tuple(dict.fromkeys(value.strip() for value in raw.split(',') if value.strip()))
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise InvalidQuery(f"Неизвестные значения {param}: {', '.join(unknown)}")
+    return values
+
+
+def parse_product_query(request):
+    """Возвращает (fields, expand) из параметров запроса"""
+    fields = _parse_list(request, 'fields', PRODUCT_FIELDS, PRODUCT_FIELDS)
+    expand = _parse_list(request, 'expand', PRODUCT_EXPANSIONS, ())
+    return fields, expand
+
+
+def product_queryset(queryset, fields, expand, extra=()):
+    """
+    Подготавливает выборку под проекцию.
+    extra - служебные поля, которые нужны вызывающему коду (например, ключ
+    пагинации), даже если клиент их не запросил.
+    """
+    needed = tuple(dict.fromkeys(fields + tuple(extra)))
+    if not expand:
+        return queryset.values(*needed)
+
+    only = list(needed)
+    if 'category' in expand:
+        only.append('category')
+        queryset = queryset.select_related('category')
+    if 'images' in expand:
+        queryset = queryset.prefetch_related(Prefetch(
+            'product_images',
+            queryset=ProductImage.objects.only('id', 'product_id', 'image', 'is_main')
+        ))
+    if 'stock' in expand:
+        only.extend(f'stock_summary__{field}' for field in STOCK_FIELDS)
+        queryset = queryset.select_related('stock_summary')
+    return queryset.only(*only)
+
+
+def serialize_product(product, fields, expand):
+    """Словарь товара: строка .values() или модель с подгруженными связями"""
+    if isinstance(product, dict):
+        return {field: product[field] for field in fields}
+
+    data = {field: getattr(product, field) for field in fields}
+    if 'category' in expand:
+        category = product.category
+        data['category'] = {
+            'id': category.id,
+            'name': category.name,
+            'slug': category.slug,
+            'parent_id': category.parent_id,
+        } if category else None
+    if 'images' in expand:
+        data['images'] = [
+            {'id': image.id, 'url': image.image.url, 'is_main': image.is_main}
+            for image in product.product_images.all()
+        ]
+    if 'stock' in expand:
+        summary = getattr(product, 'stock_summary', None)
+        data['stock'] = {field: getattr(summary, field, 0) for field in STOCK_FIELDS}
+        data['stock']['status'] = product.get_availability_status()
+    return data
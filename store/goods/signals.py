@@ -0,0 +1,46 @@
+# app goods/signals.py
+from django.db.models.functions import Substr
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Product, Tombstone
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Product)
+def record_product_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(object_type='product', object_id=instance.pk)
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def touch_category_dependants(sender, instance, **kwargs):
+    # Дочерние категории и товары теряют ссылку через SET_NULL,
+    # которое не обновляет auto_now - отмечаем их изменёнными вручную
+    now = timezone.now()
+    instance.products.update(updated_at=now)
+
+    # Дочерние категории становятся корневыми: срезаем путь удаляемой
+    # категории у всего поддерева. Путь берём из БД - при каскадном
+    # удалении объект в памяти мог устареть.
+    path = Category.objects.filter(pk=instance.pk).values_list('path', flat=True).first()
+    if path:
+        Category.objects.filter(
+            Category.subtree_q(path)
+        ).exclude(pk=instance.pk).update(
+            path=Substr('path', len(path) + 1),
+            updated_at=now
+        )
+    else:
+        instance.children.update(updated_at=now)
+
+
+@receiver(post_delete, sender=Category)
+def record_category_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(object_type='category', object_id=instance.pk)
@@ -4,7 +4,12 @@ from . import views
 
 urlpatterns = [
     path('categories/', views.category_list, name='category-list'),
+    path('categories/tree/', views.category_tree, name='category-tree'),
     path('categories/<int:pk>/', views.category_detail, name='category-detail'),
     path('products/', views.product_list, name='product-list'),
+    path('products/search/', views.product_search, name='product-search'),
+    path('products/batch/', views.product_batch, name='product-batch'),
+    path('products/bulk/', views.product_bulk_upsert, name='product-bulk-upsert'),
     path('products/<int:pk>/', views.product_detail, name='product-detail'),
+    path('changes/', views.catalog_changes, name='catalog-changes'),
 ]
\ No newline at end of file
@@ -1,45 +1,274 @@
-from django.http import JsonResponse
-from .models import Category, Product
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import condition
+from .models import Category, Product, Tombstone
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_keyset, wants_pagination
+from .search import get_search_backend
+from .serializers import InvalidQuery, parse_product_query, product_queryset, serialize_product
+from store.renderers import JSONResponse, dumps
+from datetime import timedelta
+import hashlib
 import json
 
+# Перекрытие окна синхронизации: транзакции, зафиксированные чуть позже
+# момента выдачи токена, не теряются (клиент применяет изменения идемпотентно)
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# Размер пачки строк, которую курсор БД отдаёт за один раз при потоковой выдаче
+STREAM_CHUNK_SIZE = 2000
+
+# Сколько товаров максимум отдаёт поиск за один запрос
+MAX_SEARCH_RESULTS = 100
+
+# Предел ключей в одном пакетном запросе товаров (?ids= / ?codes=)
+MAX_BATCH_LOOKUP = 1000
+
+# Сколько строк массовой загрузки товаров уходит в один INSERT ... ON CONFLICT
+BULK_BATCH_SIZE = 1000
+
+# Необязательные ключи строки загрузки -> поле Product. Существующему товару
+# перезаписываются только те из них, что есть в строке
+BULK_OPTIONAL_FIELDS = {
+    'description': 'description',
+    'category_id': 'category',
+}
+
+
+def _stream_json_array(rows, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Генератор JSON-массива по итератору строк-словарей.
+    Строки приходят из серверного курсора (.iterator()), поэтому
+    в памяти одновременно находится не больше одной пачки.
+    """
+    yield b'['
+    buffer = []
+    separator = b''
+    for row in rows:
+        buffer.append(separator + dumps(row))
+        separator = b','
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+    if buffer:
+        yield b''.join(buffer)
+    yield b']'
+
+
+def _paginated_response(request, queryset, serialize=None):
+    """Страница списка по курсору (name, id) вместе с курсором следующей"""
+    try:
+        rows, next_cursor = paginate_keyset(queryset, request)
+    except InvalidCursor as e:
+        return JSONResponse({'error': str(e)}, status=400)
+    if serialize:
+        rows = [serialize(row) for row in rows]
+    return JSONResponse({'results': rows, 'next': next_cursor})
+
 
 def category_list(request):
     if request.method == 'GET':
         categories = Category.objects.all()
+        if wants_pagination(request):
+            return _paginated_response(request, categories.values())
         data = list(categories.values())
-        return JsonResponse(data, safe=False)
+        return JSONResponse(data, safe=False)
 
     elif request.method == 'POST':
         data = json.loads(request.body)
         category = Category.objects.create(
             name=data['name'],
-            description=data.get('description', ''),
             parent_id=data.get('parent_id')
         )
-        return JsonResponse({'id': category.id}, status=201)
+        return JSONResponse({'id': category.id}, status=201)
 
 
 def category_detail(request, pk):
     try:
         category = Category.objects.get(pk=pk)
     except Category.DoesNotExist:
-        return JsonResponse({'error': 'Not found'}, status=404)
+        return JSONResponse({'error': 'Not found'}, status=404)
 
     if request.method == 'GET':
         data = {
             'id': category.id,
             'name': category.name,
-            'description': category.description,
-            'parent_id': category.parent_id
+            'slug': category.slug,
+            'parent_id': category.parent_id,
+            'path': category.path
         }
-        return JsonResponse(data)
+        return JSONResponse(data)
+
+
+def category_tree(request):
+    """
+    Всё дерево категорий одним запросом.
+    Дети каждого узла упорядочены по названию (Category.Meta.ordering).
+    """
+    rows = list(Category.objects.values('id', 'name', 'slug', 'parent_id'))
+    nodes = {row['id']: dict(row, children=[]) for row in rows}
+    roots = []
+    for row in rows:
+        parent = nodes.get(row['parent_id'])
+        (parent['children'] if parent else roots).append(nodes[row['id']])
+    return JSONResponse(roots, safe=False)
+
+
+# ========== УСЛОВНЫЕ GET-ЗАПРОСЫ (ETag / Last-Modified) ==========
+# Валидаторы считаются по Product.updated_at без сериализации товаров,
+# поэтому повторный опрос неизменившегося каталога отвечает 304.
+# С ?expand=stock учитывается и время изменения остатков (StockSummary),
+# с ?expand=category и ?category= - категорий. У изображений времени
+# изменения нет, поэтому ответы с ?expand=images всегда отдаются полностью.
+
+# Развёртывание -> поле со временем изменения развёрнутых данных
+EXPANSION_MODIFIED_FIELDS = {
+    'category': 'category__updated_at',
+    'stock': 'stock_summary__updated_at',
+}
+
+
+def _expansions(request):
+    """?expand= в разборе сериализатора; None - некорректный запрос (ответ 400)"""
+    try:
+        return set(parse_product_query(request)[1])
+    except InvalidQuery:
+        return None
+
 
+def _is_conditional(request):
+    expand = _expansions(request)
+    return request.method in ('GET', 'HEAD') and expand is not None and 'images' not in expand
 
+
+def _expansion_modified_fields(request):
+    expand = _expansions(request) or ()
+    return [field for name, field in EXPANSION_MODIFIED_FIELDS.items() if name in expand]
+
+
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _product_list_state(request):
+    """
+    MAX(updated_at) и COUNT(*) каталога, один раз на HTTP-запрос.
+    Время последнего удаления товара (Tombstone) тоже входит в Last-Modified:
+    иначе удаление не сдвигает его и If-Modified-Since отвечает 304
+    """
+    if not hasattr(request, '_product_list_state'):
+        expansion_fields = _expansion_modified_fields(request)
+        aggregates = {'last_modified': Max('updated_at'), 'count': Count('id')}
+        aggregates.update((field, Max(field)) for field in expansion_fields)
+        state = Product.objects.aggregate(**aggregates)
+        deleted_types = ['product']
+        category_modified = None
+        if request.GET.get('category'):
+            # ?category= отбирает поддерево по путям категорий: перенос
+            # или удаление категории меняет выборку без изменения товаров
+            deleted_types.append('category')
+            category_modified = Category.objects.aggregate(updated_at=Max('updated_at'))['updated_at']
+        deleted_at = Tombstone.objects.filter(object_type__in=deleted_types).aggregate(
+            deleted_at=Max('deleted_at')
+        )['deleted_at']
+        state['last_modified'] = _latest(
+            state['last_modified'],
+            deleted_at,
+            category_modified,
+            *[state.pop(field) for field in expansion_fields]
+        )
+        request._product_list_state = state
+    return request._product_list_state
+
+
+def _product_list_etag(request):
+    if not _is_conditional(request):
+        return None
+    state = _product_list_state(request)
+    last_modified = state['last_modified']
+    # Количество учитывает удаления, строка запроса - разные страницы/режимы
+    raw = '{}:{}:{}'.format(
+        state['count'],
+        last_modified.isoformat() if last_modified else '',
+        request.GET.urlencode()
+    )
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _product_list_last_modified(request):
+    if not _is_conditional(request):
+        return None
+    return _product_list_state(request)['last_modified']
+
+
+def _product_updated_at(request, pk):
+    if not hasattr(request, '_product_updated_at'):
+        fields = ['updated_at'] + _expansion_modified_fields(request)
+        row = Product.objects.filter(pk=pk).values_list(*fields).first()
+        request._product_updated_at = _latest(*row) if row else None
+    return request._product_updated_at
+
+
+def _product_etag(request, pk):
+    if not _is_conditional(request):
+        return None
+    updated_at = _product_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    # ?fields= и ?expand= дают разные представления одного товара
+    variant = hashlib.md5(request.GET.urlencode().encode('utf-8')).hexdigest()[:8]
+    return f'{pk}-{updated_at.timestamp():.6f}-{variant}'
+
+
+def _product_last_modified(request, pk):
+    if not _is_conditional(request):
+        return None
+    return _product_updated_at(request, pk)
+
+
+@condition(etag_func=_product_list_etag, last_modified_func=_product_list_last_modified)
 def product_list(request):
     if request.method == 'GET':
+        try:
+            fields, expand = parse_product_query(request)
+        except InvalidQuery as e:
+            return JSONResponse({'error': str(e)}, status=400)
+
+        def serialize(product):
+            return serialize_product(product, fields, expand)
+
         products = Product.objects.all()
-        data = list(products.values())
-        return JsonResponse(data, safe=False)
+        if request.GET.get('category'):
+            # Товары категории и всех её подкатегорий - один диапазон по пути
+            try:
+                category_id = int(request.GET['category'])
+            except ValueError:
+                return JSONResponse({'error': 'category должен быть целым числом'}, status=400)
+            path = Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+            if path is None:
+                return JSONResponse({'error': 'Категория не найдена'}, status=404)
+            products = products.filter(Category.subtree_q(path, prefix='category__'))
+
+        if request.GET.get('stream') == '1':
+            # Потоковый режим: ответ начинает уходить клиенту сразу,
+            # расход памяти не зависит от размера каталога
+            rows = product_queryset(products, fields, expand).iterator(chunk_size=STREAM_CHUNK_SIZE)
+            return StreamingHttpResponse(
+                _stream_json_array(map(serialize, rows)),
+                content_type='application/json'
+            )
+        if wants_pagination(request):
+            # Ключ курсора нужен пагинации, даже если его нет в ?fields=
+            return _paginated_response(
+                request,
+                product_queryset(products, fields, expand, extra=('name', 'id')),
+                serialize
+            )
+        data = [serialize(product) for product in product_queryset(products, fields, expand)]
+        return JSONResponse(data, safe=False)
 
     elif request.method == 'POST':
         data = json.loads(request.body)
@@ -49,23 +278,278 @@ def product_list(request):
             description=data.get('description', ''),
             category_id=data.get('category_id')
         )
-        return JsonResponse({'id': product.id}, status=201)
+        return JSONResponse({'id': product.id}, status=201)
 
 
+@condition(etag_func=_product_etag, last_modified_func=_product_last_modified)
 def product_detail(request, pk):
     try:
-        product = Product.objects.get(pk=pk)
-    except Product.DoesNotExist:
-        return JsonResponse({'error': 'Not found'}, status=404)
+        fields, expand = parse_product_query(request)
+    except InvalidQuery as e:
+        return JSONResponse({'error': str(e)}, status=400)
+
+    product = product_queryset(Product.objects.filter(pk=pk), fields, expand).first()
+    if product is None:
+        return JSONResponse({'error': 'Not found'}, status=404)
 
     if request.method == 'GET':
-        data = {
-            'id': product.id,
-            'code': product.code,
-            'name': product.name,
-            'description': product.description,
-            'category_id': product.category_id,
-            'created_at': product.created_at,
-            'updated_at': product.updated_at
-        }
-        return JsonResponse(data)
\ No newline at end of file
+        return JSONResponse(serialize_product(product, fields, expand))
+
+
+def catalog_changes(request):
+    """
+    Лента изменений каталога: товары и категории, созданные или изменённые
+    после токена ?since=, и удалённые после него. Без токена - полный снимок.
+    В ответе новый токен для следующей синхронизации.
+    """
+    # Момент фиксируем до выборок, чтобы не пропустить изменения во время запроса
+    token_time = timezone.now()
+
+    products = Product.objects.all()
+    categories = Category.objects.all()
+    tombstones = Tombstone.objects.none()
+
+    since_token = request.GET.get('since')
+    if since_token:
+        try:
+            since = parse_datetime(decode_cursor(since_token, 1)[0])
+        except (InvalidCursor, TypeError, ValueError):
+            since = None
+        if since is None:
+            return JSONResponse({'error': 'Некорректный токен синхронизации'}, status=400)
+        since -= SYNC_OVERLAP
+        products = products.filter(updated_at__gte=since)
+        categories = categories.filter(updated_at__gte=since)
+        tombstones = Tombstone.objects.filter(deleted_at__gte=since)
+
+    deleted = {'products': [], 'categories': []}
+    deleted_keys = {'product': 'products', 'category': 'categories'}
+    for object_type, object_id in tombstones.values_list('object_type', 'object_id'):
+        deleted[deleted_keys[object_type]].append(object_id)
+
+    return JSONResponse({
+        'products': list(products.order_by().values()),
+        'categories': list(categories.order_by().values()),
+        'deleted': deleted,
+        'token': encode_cursor([token_time.isoformat()]),
+    })
+
+
+def _products_by_key(queryset, key_field, fields, expand):
+    """Сериализованные товары выборки в словаре по key_field"""
+    rows = product_queryset(queryset.order_by(), fields, expand, extra=(key_field,))
+    found = {}
+    for row in rows:
+        key = row[key_field] if isinstance(row, dict) else getattr(row, key_field)
+        found[key] = serialize_product(row, fields, expand)
+    return found
+
+
+def product_batch(request):
+    """
+    Пакетное получение товаров одним запросом IN:
+    ?ids=1,2,3 или ?codes=A,B. Результат - словарь по ключу запроса
+    и список ненайденных ключей.
+    """
+    if 'ids' in request.GET:
+        key_field = 'id'
+        try:
+            keys = [int(value) for value in request.GET['ids'].split(',') if value]
+        except ValueError:
+            return JSONResponse({'error': 'ids должны быть целыми числами'}, status=400)
+    elif 'codes' in request.GET:
+        key_field = 'code'
+        keys = [value for value in request.GET['codes'].split(',') if value]
+    else:
+        return JSONResponse({'error': 'Укажите ids или codes'}, status=400)
+
+    try:
+        fields, expand = parse_product_query(request)
+    except InvalidQuery as e:
+        return JSONResponse({'error': str(e)}, status=400)
+
+    keys = list(dict.fromkeys(keys))
+    if len(keys) > MAX_BATCH_LOOKUP:
+        return JSONResponse(
+            {'error': f'Не больше {MAX_BATCH_LOOKUP} ключей за запрос'}, status=400
+        )
+
+    found = _products_by_key(
+        Product.objects.filter(**{f'{key_field}__in': keys}), key_field, fields, expand
+    )
+    return JSONResponse({
+        'results': {str(key): found[key] for key in keys if key in found},
+        'missing': [key for key in keys if key not in found],
+    })
+
+
+def product_search(request):
+    """
+    Поиск товаров: ?q= (префиксы слов по названию, коду и описанию).
+    Результаты упорядочены по релевантности, не больше ?limit= штук.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JSONResponse({'error': 'Укажите q'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', MAX_SEARCH_RESULTS))
+    except ValueError:
+        return JSONResponse({'error': 'limit должен быть целым числом'}, status=400)
+    # В пределах 1..MAX_SEARCH_RESULTS: отрицательный LIMIT в SQLite снимает ограничение
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    try:
+        fields, expand = parse_product_query(request)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status=400)
+
+    ids = get_search_backend().search(query, limit)
+    found = _products_by_key(Product.objects.filter(pk__in=ids), 'id', fields, expand)
+    return JSONResponse([found[pk] for pk in ids if pk in found], safe=False)
+
+
+# ========== МАССОВАЯ ЗАГРУЗКА ТОВАРОВ ==========
+
+def _iter_bulk_rows(request):
+    """
+    Строки загрузки: JSON-массив или NDJSON (по строке JSON на товар).
+    NDJSON читается из потока запроса построчно, без разбора всего тела.
+    Нераспознанная строка отдаётся как None и попадает в ошибки.
+    """
+    content_type = request.content_type or ''
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        for line in request:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+    else:
+        # Читаем поток напрямую: request.body ограничен DATA_UPLOAD_MAX_MEMORY_SIZE
+        data = json.loads(request.read())
+        if not isinstance(data, list):
+            raise ValueError('Ожидается JSON-массив товаров')
+        yield from data
+
+
+def _validate_bulk_row(row):
+    """Возвращает текст ошибки или None"""
+    if not isinstance(row, dict):
+        return 'Некорректная строка'
+    code = row.get('code')
+    name = row.get('name')
+    if not isinstance(code, str) or not code:
+        return 'Не указан код товара'
+    if len(code) > Product._meta.get_field('code').max_length:
+        return 'Слишком длинный код товара'
+    if not isinstance(name, str) or not name:
+        return 'Не указано название товара'
+    if len(name) > Product._meta.get_field('name').max_length:
+        return 'Слишком длинное название товара'
+    category_id = row.get('category_id')
+    if category_id is not None and not isinstance(category_id, int):
+        return 'category_id должен быть целым числом'
+    return None
+
+
+def _upsert_product_batch(batch):
+    """
+    Вставка/обновление пачки [(номер строки, данные)] одним
+    INSERT ... ON CONFLICT (code) DO UPDATE. Возвращает результаты по строкам.
+    """
+    results = {}
+    valid = {}
+    for index, row in batch:
+        error = _validate_bulk_row(row)
+        if error:
+            results[index] = {'row': index, 'status': 'error', 'error': error}
+            continue
+        previous = valid.get(row['code'])
+        if previous is not None:
+            # Один код дважды в пачке: действует последняя строка
+            results[previous[0]] = {
+                'row': previous[0], 'code': row['code'], 'status': 'superseded'
+            }
+        valid[row['code']] = (index, row)
+
+    category_ids = {row['category_id'] for _, row in valid.values() if row.get('category_id') is not None}
+    known_categories = set(
+        Category.objects.filter(pk__in=category_ids).values_list('pk', flat=True)
+    ) if category_ids else set()
+
+    products = []
+    indexes = []
+    # Набор обновляемых полей -> товары: у каждой группы свой update_fields
+    groups = {}
+    for code, (index, row) in valid.items():
+        category_id = row.get('category_id')
+        if category_id is not None and category_id not in known_categories:
+            results[index] = {'row': index, 'code': code, 'status': 'error', 'error': 'Категория не найдена'}
+            continue
+        product = Product(
+            code=code,
+            name=row['name'],
+            description=row.get('description', ''),
+            category_id=category_id
+        )
+        products.append(product)
+        indexes.append(index)
+        update_fields = ('name',) + tuple(
+            field for key, field in BULK_OPTIONAL_FIELDS.items() if key in row
+        ) + ('updated_at',)
+        groups.setdefault(update_fields, []).append(product)
+
+    if products:
+        with transaction.atomic():
+            existing = set(
+                Product.objects.filter(code__in=[p.code for p in products]).values_list('code', flat=True)
+            )
+            for update_fields, group in groups.items():
+                Product.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=['code'],
+                    update_fields=list(update_fields)
+                )
+            # bulk_create не шлёт post_save - обновляем поисковый индекс пачкой.
+            # Описание берём из БД: строка могла его не содержать
+            get_search_backend().index(
+                Product.objects.filter(pk__in=[p.pk for p in products]).only('name', 'code', 'description')
+            )
+        for index, product in zip(indexes, products):
+            results[index] = {
+                'row': index,
+                'code': product.code,
+                'id': product.pk,
+                'status': 'updated' if product.code in existing else 'created'
+            }
+
+    return [results[index] for index, _ in batch if index in results]
+
+
+def product_bulk_upsert(request):
+    """
+    Массовая загрузка каталога поставщика: создаёт новые товары и
+    обновляет существующие по коду пачками по BULK_BATCH_SIZE строк
+    """
+    if request.method != 'POST':
+        return JSONResponse({'error': 'Method not allowed'}, status=405)
+
+    results = []
+    batch = []
+    try:
+        for index, row in enumerate(_iter_bulk_rows(request)):
+            batch.append((index, row))
+            if len(batch) >= BULK_BATCH_SIZE:
+                results.extend(_upsert_product_batch(batch))
+                batch = []
+        if batch:
+            results.extend(_upsert_product_batch(batch))
+    except ValueError as e:
+        return JSONResponse({'error': str(e), 'results': results}, status=400)
+
+    summary = {'created': 0, 'updated': 0, 'superseded': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return JSONResponse({'summary': summary, 'results': results})
@@ -1,18 +1,64 @@
 # app sales\admin
+from django import forms
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Sale, SaleItem, SaleCancellation
 
 
+class SavedUnitChoiceField(forms.ModelChoiceField):
+    """
+    Единица сохранённой позиции продажи: вариант только один - её текущая
+    единица, в том числе уже перенесённая в архив (её нет в ProductUnit)
+    """
+
+    def __init__(self, unit, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unit = unit
+        self.choices = [(unit.pk, str(unit))]
+
+    def to_python(self, value):
+        if value not in self.empty_values and str(value) == str(self.unit.pk):
+            return self.unit
+        return super().to_python(value)
+
+
+class SaleItemInlineForm(forms.ModelForm):
+    """Единицу сохранённой позиции не меняют: поле только для чтения"""
+
+    class Meta:
+        model = SaleItem
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            field = self.fields['product_unit']
+            self.fields['product_unit'] = SavedUnitChoiceField(
+                self.instance.get_product_unit(),
+                queryset=field.queryset,
+                label=field.label,
+                disabled=True
+            )
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        if self.instance.pk:
+            # Проверка ForeignKey ищет единицу только в ProductUnit, архивную не найдёт
+            exclude.add('product_unit')
+        return exclude
+
+
 class SaleItemInline(admin.TabularInline):
     """Позиции продажи в интерфейсе Sale"""
     model = SaleItem
+    form = SaleItemInlineForm
     extra = 0
     readonly_fields = ('get_product_info', 'cancelled')
     fields = ('get_product_info', 'product_unit', 'actual_price', 'cancelled')
 
     def get_product_info(self, obj):
-        return f"{obj.product_unit.product.name} (SN: {obj.product_unit.serial_number})"
+        unit = obj.get_product_unit()
+        return f"{unit.product.name} (SN: {unit.serial_number})"
 
     get_product_info.short_description = 'Товар'
 
@@ -23,7 +69,8 @@ class SaleAdmin(admin.ModelAdmin):
     list_filter = ('sale_type', 'created_at')
     search_fields = ('id', 'customer__name')
     inlines = (SaleItemInline,)
-    readonly_fields = ('created_at', 'display_items')
+    # Сумму ведут позиции продажи (SaleItem.save/delete)
+    readonly_fields = ('created_at', 'total_amount', 'display_items')
 
     fieldsets = (
         (None, {
@@ -53,9 +100,10 @@ class SaleAdmin(admin.ModelAdmin):
 
         html = "<ul>"
         for item in items:
+            unit = item.get_product_unit()
             html += f"""
             <li>
-                {item.product_unit.product.name} (SN: {item.product_unit.serial_number}) - 
+                {unit.product.name} (SN: {unit.serial_number}) - 
                 {item.actual_price} ₽ {'❌' if item.cancelled else '✅'}
             </li>
             """
@@ -84,7 +132,8 @@ class SaleItemAdmin(admin.ModelAdmin):
     search_fields = ('product_unit__serial_number', 'sale__id')
 
     def get_product(self, obj):
-        return f"{obj.product_unit.product.name} (SN: {obj.product_unit.serial_number})"
+        unit = obj.get_product_unit()
+        return f"{unit.product.name} (SN: {unit.serial_number})"
 
     get_product.short_description = 'Товар'
 
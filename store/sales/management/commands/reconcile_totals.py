@@ -0,0 +1,79 @@
+# app sales/management/commands/reconcile_totals
+"""
+Пересчёт сумм документов по их позициям.
+
+    python manage.py reconcile_totals
+    python manage.py reconcile_totals --check
+
+Delivery.total_amount и Sale.total_amount поддерживаются приращениями при
+сохранении и удалении позиций; команда исправляет расхождения (ручные правки
+в БД, массовые операции в обход моделей) одним UPDATE с подзапросом на
+таблицу - меняются только строки, сумма которых отличается.
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+from sales.models import Sale, SaleItem
+from warehouse.models import Delivery, DeliveryItem
+
+
+def _items_total(items, document_field, amount):
+    """
+    Сумма позиций документа коррелированным подзапросом (0, если позиций нет),
+    округлённая до копеек, как и суммы, которые ведут приращения
+    """
+    return Round(Coalesce(
+        Subquery(
+            items.filter(**{document_field: OuterRef('pk')})
+            .order_by().values(document_field)
+            .annotate(total=Sum(amount)).values('total')
+        ),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    ), 2)
+
+
+def documents():
+    """(название, выборка документов, фактическая сумма по позициям)"""
+    return [
+        (
+            'Поставки',
+            Delivery.objects.all(),
+            _items_total(DeliveryItem.objects.all(), 'delivery', F('quantity_received') * F('price_per_unit')),
+        ),
+        (
+            'Продажи',
+            Sale.objects.all(),
+            _items_total(SaleItem.objects.all(), 'sale', F('actual_price')),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает суммы поставок и продаж по позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только посчитать расхождения, ничего не меняя'
+        )
+
+    def handle(self, *args, **options):
+        mismatched = 0
+        with transaction.atomic():
+            for title, queryset, actual in documents():
+                # Сравнение округлённых значений: хвосты REAL в SQLite - не расхождение
+                drifted = queryset.annotate(stored=Round(F('total_amount'), 2)).exclude(stored=actual)
+                if options['check']:
+                    count = drifted.count()
+                else:
+                    count = drifted.update(total_amount=actual)
+                mismatched += count
+                self.stdout.write(f'{title}: расхождений {count}')
+        if options['check'] and mismatched:
+            raise CommandError(f'Суммы расходятся у {mismatched} документов')
+        self.stdout.write(self.style.SUCCESS('Готово'))
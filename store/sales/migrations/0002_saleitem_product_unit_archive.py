@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0001_initial'),
+        ('unit', '0007_productunitarchive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='saleitem',
+            name='product_unit',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='unit.productunit', verbose_name='Единица товара'),
+        ),
+    ]
@@ -1,9 +1,13 @@
 # app sales/models
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Sum
+from django.utils import timezone
 from unit.models import ProductUnit
+from store.totals import TotalDocumentMixin, TotalLineMixin
 
 
-class Sale(models.Model):
+class Sale(TotalDocumentMixin, models.Model):
     """Документ продажи"""
     SALE_TYPES = [
         ('regular', 'Обычная продажа'),
@@ -48,11 +52,11 @@ class Sale(models.Model):
         return f"Продажа #{self.id}"
 
     def update_total(self):
-        """Пересчёт суммы продажи"""
-        self.total_amount = sum(item.actual_price for item in self.items.all())
-        self.save()
+        """Пересчёт суммы продажи одним агрегатом и UPDATE только этой колонки"""
+        self.total_amount = self.items.aggregate(total=Sum('actual_price'))['total'] or 0
+        Sale.objects.filter(pk=self.pk).update(total_amount=self.total_amount)
 
-class SaleItem(models.Model):
+class SaleItem(TotalLineMixin, models.Model):
     """Конкретная проданная единица товара"""
     sale = models.ForeignKey(
         Sale,
@@ -60,9 +64,12 @@ class SaleItem(models.Model):
         related_name='items',
         verbose_name='Продажа'
     )
+    # Проданные единицы со временем уходят в архив (archive_units),
+    # поэтому без ограничения в БД; см. get_product_unit()
     product_unit = models.ForeignKey(
         'unit.ProductUnit',
-        on_delete=models.PROTECT,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         verbose_name='Единица товара'
     )
     actual_price = models.DecimalField(
@@ -76,16 +83,35 @@ class SaleItem(models.Model):
         verbose_name = 'Позиция продажи'
         verbose_name_plural = 'Позиции продаж'
 
+    # Вклад в Sale.total_amount
+    total_document_field = 'sale'
+    total_fields = ('actual_price',)
+
     def __str__(self):
-        return f"{self.product_unit.product.name} (Цена: {self.actual_price})"
+        return f"{self.get_product_unit().product.name} (Цена: {self.actual_price})"
+
+    def get_product_unit(self):
+        """Единица товара, в том числе уже перенесённая в архив"""
+        try:
+            return self.product_unit
+        except ProductUnit.DoesNotExist:
+            return ProductUnit.all_objects.filter(pk=self.product_unit_id).get()
 
     def save(self, *args, **kwargs):
-        if not self.cancelled:
-            if self.product_unit.status not in ['in_store']:
-                raise ValidationError("Нельзя продать товар с текущим статусом")
-            self.product_unit.status = 'sold'
-            self.product_unit.save()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if not self.cancelled and self._state.adding:
+                # Условный перевод in_store -> sold: если единицу уже продали
+                # параллельно, UPDATE её не затронет
+                sale_date = timezone.localdate()
+                if not ProductUnit.objects.transition(
+                    [self.product_unit_id], ['in_store'], 'sold',
+                    source=self.sale, sale_date=sale_date, sale_price=self.actual_price
+                ):
+                    raise ValidationError("Нельзя продать товар с текущим статусом")
+                self.product_unit.status = 'sold'
+                self.product_unit.sale_date = sale_date
+                self.product_unit.sale_price = self.actual_price
+            super().save(*args, **kwargs)
 
 class SaleCancellation(models.Model):
     """Документ отмены продажи"""
@@ -110,7 +136,8 @@ class SaleCancellation(models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        # Всегда возвращаем товары в статус 'in_store'
-        for unit in self.restored_units.all():
-            unit.status = 'in_store'
-            unit.save()
\ No newline at end of file
+        # Возвращаем проданные товары в статус 'in_store' одним UPDATE
+        ProductUnit.objects.transition(
+            self.restored_units.values_list('pk', flat=True), ['sold'], 'in_store',
+            source=self
+        )
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Микробенчмарк сериализации product_list.
+
+Создаёт временную БД в памяти, заполняет её товарами и замеряет время
+ответа GET /api/products/ для каждого доступного JSON-бэкенда
+(store.renderers.BACKENDS), а также время одной только сериализации.
+
+    python scripts/bench_json.py --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'store.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def setup_database():
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(rows):
+    from goods.models import Category, Product
+    category = Category.objects.create(name='Бенчмарк')
+    Product.objects.bulk_create(
+        [
+            Product(
+                code=f'BENCH-{i:06d}',
+                name=f'Товар для замера {i}',
+                description='Описание товара ' * 10,
+                category=category,
+            )
+            for i in range(rows)
+        ],
+        batch_size=1000
+    )
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер JSON-сериализации product_list')
+    parser.add_argument('--rows', type=int, default=10000, help='Сколько товаров создать')
+    parser.add_argument('--repeat', type=int, default=5, help='Сколько раз повторить замер')
+    args = parser.parse_args()
+
+    setup_database()
+    seed(args.rows)
+
+    from django.test import RequestFactory, override_settings
+    from goods.models import Product
+    from goods.views import product_list
+    from store.renderers import BACKENDS
+
+    factory = RequestFactory()
+    rows = list(Product.objects.values())
+
+    print(f'Товаров: {args.rows}, повторов: {args.repeat} (лучшее время)')
+    print(f'{"бэкенд":<10} {"сериализация, мс":>18} {"product_list, мс":>18} {"размер, КБ":>12}')
+    for name, dumps in BACKENDS.items():
+        with override_settings(API_JSON_BACKEND=name):
+            serialize = best_of(args.repeat, lambda: dumps(rows))
+            view = best_of(args.repeat, lambda: product_list(factory.get('/api/products/')))
+            size = len(product_list(factory.get('/api/products/')).content)
+        print(f'{name:<10} {serialize * 1000:>18.1f} {view * 1000:>18.1f} {size / 1024:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
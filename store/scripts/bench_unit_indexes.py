@@ -0,0 +1,217 @@
+"""
+Замер горячих запросов к ProductUnit до и после частичных индексов.
+
+Создаёт отдельную БД SQLite (по умолчанию во временном каталоге),
+заполняет её единицами товара с реалистичным распределением статусов
+(в основном проданные) и для каждого запроса печатает EXPLAIN QUERY PLAN
+и лучшее время - сначала на схеме до миграции unit.0008 (общий индекс
+(status, product)), затем после неё (частичные индексы unit_in_request_idx
+и unit_in_store_product_idx).
+
+    python scripts/bench_unit_indexes.py --units 5000000
+    python scripts/bench_unit_indexes.py --units 200000 --db /tmp/units.sqlite3 --keep
+
+Повторный запуск с тем же --db и --keep не заполняет базу заново.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'store.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+# Доли статусов в заполненной базе: проданных подавляющее большинство
+STATUS_WEIGHTS = {
+    'sold': 90,
+    'in_store': 5,
+    'in_request': 2,
+    'in_request_cancelled': 1,
+    'broken': 1,
+    'lost': 1,
+}
+BEFORE_MIGRATION = '0007_productunitarchive'
+AFTER_MIGRATION = '0008_productunit_partial_indexes'
+SEED_CHUNK = 50000
+
+
+def setup_database(path):
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(units, products, request_items):
+    from django.db import connection, transaction
+    from goods.models import Category, Product
+    from unit.models import ProductUnit
+    from warehouse.models import Request, RequestItem
+
+    if ProductUnit.objects.exists():
+        print(f'База уже заполнена: {ProductUnit.objects.count()} единиц')
+        return
+
+    category = Category.objects.create(name='Бенчмарк')
+    Product.objects.bulk_create(
+        [Product(code=f'BENCH-{i:06d}', name=f'Товар {i}', category=category) for i in range(products)],
+        batch_size=1000
+    )
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    request = Request.objects.create(notes='Бенчмарк')
+    RequestItem.objects.bulk_create(
+        [
+            RequestItem(request=request, product_id=random.choice(product_ids), quantity_ordered=1, price_per_unit=100)
+            for _ in range(request_items)
+        ],
+        batch_size=1000
+    )
+    request_item_ids = list(RequestItem.objects.values_list('id', flat=True))
+
+    # Вставка напрямую в таблицу: модельные save/create_batch здесь лишние
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    table = ProductUnit._meta.db_table
+    sql = (
+        f'INSERT INTO {table} (serial_number, product_id, request_item_id, status, created_at, sale_date) '
+        'VALUES (%s, %s, %s, %s, %s, %s)'
+    )
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous = OFF')
+        for start in range(0, units, SEED_CHUNK):
+            rows = []
+            for n in range(start, min(start + SEED_CHUNK, units)):
+                status = random.choices(statuses, weights)[0]
+                rows.append((
+                    f'BENCH-{n:09d}',
+                    random.choice(product_ids),
+                    random.choice(request_item_ids) if status.startswith('in_request') else None,
+                    status,
+                    '2024-01-01 00:00:00',
+                    '2024-06-01' if status == 'sold' else None,
+                ))
+            with transaction.atomic():
+                cursor.executemany(sql, rows)
+            print(f'\rЗаполнение: {min(start + SEED_CHUNK, units)} / {units}', end='', flush=True)
+        cursor.execute('ANALYZE')
+    print(f'\nЗаполнено за {time.perf_counter() - started:.1f} с')
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def hot_queries():
+    """Запросы приёмки, проверки наличия и продажи"""
+    from goods.models import Product
+    from unit.models import ProductUnit
+    from warehouse.models import RequestItem
+
+    sample = random.Random(1)
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    products = sample.sample(product_ids, min(50, len(product_ids)))
+    request_item_ids = list(RequestItem.objects.values_list('id', flat=True))
+    request_items = sample.sample(request_item_ids, min(50, len(request_item_ids)))
+
+    in_request = ProductUnit.objects.filter(status='in_request')
+    return [
+        (
+            'Виджет приёмки: все единицы в заявке',
+            in_request.values_list('pk', 'serial_number'),
+            lambda: list(in_request.values_list('pk', 'serial_number')),
+        ),
+        (
+            'Единицы в заявке по 50 позициям заявок',
+            in_request.filter(request_item_id=request_items[0]).values_list('pk'),
+            lambda: [list(in_request.filter(request_item_id=pk).values_list('pk')) for pk in request_items],
+        ),
+        (
+            'Наличие: число единиц в магазине, 50 товаров',
+            ProductUnit.objects.filter(product_id=products[0], status='in_store'),
+            lambda: [ProductUnit.objects.filter(product_id=pk, status='in_store').count() for pk in products],
+        ),
+        (
+            'Продажа: первая единица в магазине, 50 товаров',
+            ProductUnit.objects.filter(product_id=products[0], status='in_store').order_by('pk').values_list('pk')[:1],
+            lambda: [
+                ProductUnit.objects.filter(product_id=pk, status='in_store').order_by('pk').values_list('pk').first()
+                for pk in products
+            ],
+        ),
+    ]
+
+
+def index_sizes():
+    """Размер индексов ProductUnit в байтах (если SQLite собран с dbstat)"""
+    from django.db import connection
+    from django.db.utils import OperationalError
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'unit_productunit') "
+                "GROUP BY name ORDER BY name"
+            )
+            return cursor.fetchall()
+    except OperationalError:
+        return []
+
+
+def run(title, repeat):
+    print(f'\n===== {title} =====')
+    for name, queryset, func in hot_queries():
+        timing = best_of(repeat, func)
+        print(f'\n{name}: {timing * 1000:.2f} мс')
+        print(queryset.explain())
+    for name, size in index_sizes():
+        print(f'  индекс {name}: {size / 1024 / 1024:.1f} МБ')
+
+
+def migrate_unit(migration):
+    from django.core.management import call_command
+    from django.db import connection
+    call_command('migrate', 'unit', migration, verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер частичных индексов ProductUnit')
+    parser.add_argument('--units', type=int, default=5000000, help='Сколько единиц создать')
+    parser.add_argument('--products', type=int, default=10000, help='Сколько товаров создать')
+    parser.add_argument('--request-items', type=int, default=2000, help='Сколько позиций заявок создать')
+    parser.add_argument('--repeat', type=int, default=3, help='Сколько раз повторить замер')
+    parser.add_argument('--db', help='Файл БД (по умолчанию временный)')
+    parser.add_argument('--keep', action='store_true', help='Не удалять файл БД после замера')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_units.sqlite3')
+    setup_database(path)
+    try:
+        seed(args.units, args.products, args.request_items)
+        migrate_unit(BEFORE_MIGRATION)
+        run('Общий индекс (status, product)', args.repeat)
+        migrate_unit(AFTER_MIGRATION)
+        run('Частичные индексы', args.repeat)
+    finally:
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# this  main app project store\renderers
+"""
+JSON-ответы API.
+
+Сериализатор выбирается настройкой API_JSON_BACKEND:
+'orjson' - быстрый orjson (если установлен), 'stdlib' - json + DjangoJSONEncoder,
+'auto' (по умолчанию) - orjson при наличии, иначе stdlib.
+Оба варианта отдают datetime в ISO 8601 с микросекундами и 'Z' для UTC,
+Decimal - строкой.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(value):
+    # orjson сам сериализует datetime/date/UUID, но не Decimal
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def _dumps_orjson(data):
+    return orjson.dumps(
+        data,
+        default=_orjson_default,
+        option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class _StdlibJSONEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder обрезает datetime и time до миллисекунд, orjson -
+    нет: оставляем микросекунды, чтобы ответы не зависели от сериализатора
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            r = o.isoformat()
+            if r.endswith('+00:00'):
+                r = r[:-6] + 'Z'
+            return r
+        return super().default(o)
+
+
+def _dumps_stdlib(data):
+    return json.dumps(
+        data,
+        cls=_StdlibJSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+BACKENDS = {
+    'stdlib': _dumps_stdlib,
+}
+if orjson is not None:
+    BACKENDS['orjson'] = _dumps_orjson
+
+
+def get_dumps():
+    """Функция сериализации согласно API_JSON_BACKEND"""
+    backend = getattr(settings, 'API_JSON_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'orjson' if 'orjson' in BACKENDS else 'stdlib'
+    return BACKENDS[backend]
+
+
+def dumps(data):
+    """Сериализует данные в JSON (bytes в UTF-8)"""
+    return get_dumps()(data)
+
+
+class JSONResponse(HttpResponse):
+    """
+    Замена JsonResponse на подключаемом сериализаторе.
+    safe=False разрешает отдавать список, как у JsonResponse.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('Для сериализации не-словаря передайте safe=False')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -157,4 +157,11 @@ DEBUG_TOOLBAR_CONFIG = {
     'DISABLE_PANELS': {
         'debug_toolbar.panels.redirects.RedirectsPanel',
     },
-}
\ No newline at end of file
+}
+
+# Сериализатор JSON для API: 'auto' (orjson, если установлен), 'orjson' или 'stdlib'
+API_JSON_BACKEND = 'auto'
+
+# Кэш поиска единиц по серийному номеру (в памяти процесса)
+UNIT_SERIAL_CACHE_SIZE = 10000
+UNIT_SERIAL_CACHE_TTL = 300  # секунд
@@ -0,0 +1,106 @@
+# this  main app project store\totals
+"""
+Суммы документов (Delivery, Sale), которые ведут их позиции.
+
+Документ хранит total_amount, позиция при сохранении и удалении прибавляет
+к ней разницу своего вклада - UPDATE с F() вместо пересчёта агрегатом.
+Расхождения исправляет команда reconcile_totals.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+
+
+class TotalDocumentMixin:
+    """Документ с total_amount, которую ведут позиции приращениями"""
+
+    def save(self, *args, **kwargs):
+        # Обычное сохранение заголовка total_amount не перезаписывает
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'total_amount'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def apply_total_deltas(cls, changes):
+        """Приращения суммы [(id документа, дельта)] - UPDATE с F() на документ"""
+        for document_id, delta in changes:
+            if document_id is not None and delta:
+                # SQLite хранит DecimalField как REAL: округление не даёт копиться хвостам 0.1 + 0.2
+                cls.objects.filter(pk=document_id).update(total_amount=Round(F('total_amount') + delta, 2))
+
+
+class TotalLineMixin:
+    """
+    Позиция документа: вклад в его сумму - произведение полей total_fields,
+    документ - внешний ключ total_document_field.
+    """
+    total_document_field = None
+    total_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Вклад на момент загрузки - только из __dict__: обращение к отложенному
+        # полю вызовет refresh_from_db, а тот снова from_db
+        loaded = instance.__dict__
+        names = (instance._document_attname(),) + tuple(cls.total_fields)
+        if all(name in loaded for name in names):
+            instance._loaded_total = instance._total_contribution(*(loaded[name] for name in names))
+        return instance
+
+    def _document_attname(self):
+        return self._meta.get_field(self.total_document_field).attname
+
+    def _total_contribution(self, document_id, *values):
+        """(id документа, вклад); значения приводятся к типам полей (до save это могут быть строки)"""
+        amount = 1
+        for name, value in zip(self.total_fields, values):
+            amount *= self._meta.get_field(name).to_python(value) or 0
+        return document_id, amount
+
+    @property
+    def line_amount(self):
+        return self._total_contribution(None, *(getattr(self, name) for name in self.total_fields))[1]
+
+    def _ensure_loaded_total(self):
+        """Вклад в сумму по строке БД, если объект загружен с отложенными полями"""
+        if getattr(self, '_loaded_total', None) is None and not self._state.adding:
+            row = type(self)._default_manager.filter(pk=self.pk).values_list(
+                self._document_attname(), *self.total_fields
+            ).first()
+            if row is not None:
+                self._loaded_total = self._total_contribution(*row)
+
+    def _update_document_total(self, deleted=False):
+        loaded = getattr(self, '_loaded_total', None)
+        if loaded is None:
+            # Объект не из БД: новая позиция или удаление по собранному вручную объекту
+            loaded = (getattr(self, self._document_attname()), self.line_amount) if deleted else (None, 0)
+        old_document_id, old_amount = loaded
+        if deleted:
+            new_document_id, new_amount = None, 0
+        else:
+            new_document_id, new_amount = getattr(self, self._document_attname()), self.line_amount
+        document_model = self._meta.get_field(self.total_document_field).related_model
+        if old_document_id == new_document_id:
+            document_model.apply_total_deltas([(new_document_id, new_amount - old_amount)])
+        else:
+            document_model.apply_total_deltas([(old_document_id, -old_amount), (new_document_id, new_amount)])
+        self._loaded_total = (new_document_id, new_amount)
+
+    def save(self, *args, **kwargs):
+        # Без точки сохранения: позиции вызывают save уже внутри своей транзакции
+        with transaction.atomic(savepoint=False):
+            self._ensure_loaded_total()
+            super().save(*args, **kwargs)
+            self._update_document_total()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            self._ensure_loaded_total()
+            result = super().delete(*args, **kwargs)
+            self._update_document_total(deleted=True)
+        return result
@@ -1,7 +1,24 @@
 # app unit/admin
 from django.contrib import admin
-from .models import ProductUnit
+from .models import ProductUnit, ProductUnitArchive, ProductUnitStatusEvent
 from django.utils.html import format_html
+from goods.search import get_search_backend
+
+class ProductUnitStatusEventInline(admin.TabularInline):
+    """История статусов единицы (только просмотр)"""
+    model = ProductUnitStatusEvent
+    extra = 0
+    can_delete = False
+    fields = ('created_at', 'from_status', 'to_status', 'source_type', 'source_id')
+    readonly_fields = fields
+    ordering = ('created_at',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(ProductUnit)
 class ProductUnitAdmin(admin.ModelAdmin):
@@ -12,12 +29,15 @@ class ProductUnitAdmin(admin.ModelAdmin):
         'status_badge',
         'created_at',
         'sale_info',  # Новое поле вместо related_links
+        'purchase_price_display',
+        'margin_display',
         'warehouse_links'  # Переименовано из related_links
     )
     list_filter = ('status', 'product__category', 'created_at')
     search_fields = ('serial_number', 'product__name', 'product__code')
     readonly_fields = ('created_at', 'sale_info_detailed')  # Добавлено новое поле
     list_select_related = ('product', 'request_item', 'delivery_item')
+    inlines = (ProductUnitStatusEventInline,)
 
     # ===== 2. ОБНОВЛЕННЫЙ FIELDSETS (удален sale_item) =====
     fieldsets = (
@@ -38,6 +58,36 @@ class ProductUnitAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_deleted_objects(self, objs, request):
+        # Проданные единицы защищены в ProductUnitQuerySet.check_deletable:
+        # показываем это на странице подтверждения, а не ошибкой при удалении
+        deleted, model_count, perms_needed, protected = super().get_deleted_objects(objs, request)
+        sale_items = ProductUnit.objects.filter(pk__in=[obj.pk for obj in objs]).sale_items()
+        protected = list(protected) + [
+            f'{item._meta.verbose_name.capitalize()}: {item}'
+            for item in sale_items.select_related('product_unit__product')
+        ]
+        return deleted, model_count, perms_needed, protected
+
+    def get_queryset(self, request):
+        # Цена закупки и маржа считаются в SQL, а не запросом на строку
+        return super().get_queryset(request).with_margin()
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Серийный номер - по началу строки (индекс уникальности),
+        товар - через полнотекстовый индекс вместо icontains
+        """
+        if (request.GET.get('model_name'), request.GET.get('field_name')) == ('deliveryitem', 'received_units'):
+            # Автодополнение в позиции поставки: принимаются только единицы из заявок
+            queryset = queryset.filter(status='in_request').order_by('-pk')
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        by_serial = queryset.filter(serial_number__startswith=search_term)
+        by_product = get_search_backend().filter(queryset, search_term, prefix='product__')
+        return by_serial | by_product, False
+
     # ===== 3. СУЩЕСТВУЮЩИЕ МЕТОДЫ (без изменений) =====
     def product_link(self, obj):
         return format_html(
@@ -77,6 +127,19 @@ class ProductUnitAdmin(admin.ModelAdmin):
         return format_html('<span style="color: gray;">—</span>')
     sale_info.short_description = 'Продажа'
 
+    def purchase_price_display(self, obj):
+        return f"{obj.purchase_price} ₽" if obj.purchase_price is not None else "—"
+    purchase_price_display.short_description = 'Закупка'
+    purchase_price_display.admin_order_field = 'purchase_price'
+
+    def margin_display(self, obj):
+        if obj.margin is None:
+            return "—"
+        color = 'green' if obj.margin >= 0 else 'red'
+        return format_html('<span style="color: {};">{} ₽</span>', color, obj.margin)
+    margin_display.short_description = 'Маржа'
+    margin_display.admin_order_field = 'margin'
+
     def sale_info_detailed(self, obj):
         """Детальная информация о продаже (только для чтения)"""
         if obj.status == 'sold':
@@ -92,4 +155,20 @@ class ProductUnitAdmin(admin.ModelAdmin):
         if obj.delivery_item:
             links.append(f'<a href="/admin/warehouse/deliveryitem/{obj.delivery_item.id}/change/">Поставка</a>')
         return format_html(' | '.join(links)) if links else '-'
-    warehouse_links.short_description = 'Складские связи'
\ No newline at end of file
+    warehouse_links.short_description = 'Складские связи'
+
+
+@admin.register(ProductUnitArchive)
+class ProductUnitArchiveAdmin(admin.ModelAdmin):
+    """Архив единиц (только просмотр, пополняется командой archive_units)"""
+    list_display = ('serial_number', 'product', 'status', 'created_at', 'sale_date', 'sale_price', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    search_fields = ('serial_number',)
+    list_select_related = ('product',)
+    date_hierarchy = 'archived_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -6,5 +6,5 @@ class UnitConfig(AppConfig):
     verbose_name = 'Управление единицами товара'
 
     def ready(self):
-        # Убедитесь, что нет прямого импорта моделей здесь
-        pass
\ No newline at end of file
+        # Сигналы сбрасывают кэш поиска по серийному номеру
+        import unit.signals
@@ -0,0 +1,74 @@
+# app unit/cache
+"""
+Кэш поиска единиц товара по серийному номеру (сканер штрихкодов).
+
+Ограниченный LRU в памяти процесса: записи вытесняются по давности
+использования и по времени жизни. Смена статуса единицы сбрасывает её
+запись после фиксации транзакции (см. ProductUnitManager.transition
+и ProductUnit.save). Кэш у каждого процесса свой, TTL ограничивает
+расхождение между процессами.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+
+class SerialLRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # serial -> (expires_at, value)
+        self._serial_by_id = {}
+        self._lock = threading.Lock()
+
+    def get(self, serial):
+        with self._lock:
+            entry = self._data.get(serial)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(serial)
+                return None
+            self._data.move_to_end(serial)
+            return entry[1]
+
+    def set(self, serial, value):
+        with self._lock:
+            self._data[serial] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(serial)
+            self._serial_by_id[value['id']] = serial
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+
+    def invalidate_ids(self, unit_ids):
+        with self._lock:
+            for unit_id in unit_ids:
+                serial = self._serial_by_id.get(unit_id)
+                if serial is not None:
+                    self._drop(serial)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._serial_by_id.clear()
+
+    def _drop(self, serial):
+        entry = self._data.pop(serial, None)
+        if entry is not None:
+            self._serial_by_id.pop(entry[1]['id'], None)
+
+
+serial_cache = SerialLRUCache(
+    maxsize=getattr(settings, 'UNIT_SERIAL_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'UNIT_SERIAL_CACHE_TTL', 300)
+)
+
+
+def invalidate_units_on_commit(unit_ids):
+    """Сбросить записи единиц после фиксации текущей транзакции"""
+    unit_ids = list(unit_ids)
+    if unit_ids:
+        transaction.on_commit(lambda: serial_cache.invalidate_ids(unit_ids))
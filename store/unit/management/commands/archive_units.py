@@ -0,0 +1,106 @@
+# app unit/management/commands/archive_units
+"""
+Перенос завершённых единиц товара в архив (ProductUnitArchive).
+
+    python manage.py archive_units --days 365
+    python manage.py archive_units --before 2025-01-01 --batch-size 2000 --dry-run
+
+Переносятся единицы в статусах ProductUnit.ARCHIVABLE_STATUSES: проданные -
+по дате продажи, остальные - по дате создания. Каждая пачка переносится
+в своей транзакции: INSERT ... SELECT в архив и удаление из рабочей таблицы,
+поэтому прерванный запуск можно просто повторить. Связь с позицией поставки
+сохраняется в архиве (delivery_item_id) - приёмка учитывает архивные единицы
+и не создаёт их заново.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from unit.models import ProductUnit, ProductUnitArchive
+from warehouse.models import DeliveryItem
+
+COLUMNS = (
+    'id', 'serial_number', 'product_id', 'request_item_id', 'delivery_item_id',
+    'status', 'created_at', 'sale_date', 'sale_price'
+)
+
+
+class Command(BaseCommand):
+    help = 'Переносит проданные, утерянные и отменённые единицы товара в архив'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Архивировать единицы старше даты (ГГГГ-ММ-ДД)')
+        parser.add_argument('--days', type=int, default=365, help='Или старше N дней (по умолчанию 365)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Единиц в одной транзакции')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать, ничего не переносить')
+
+    def handle(self, *args, **options):
+        cutoff = self.get_cutoff(options)
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+
+        queryset = self.archivable(cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'К переносу до {cutoff}: {queryset.count()} единиц')
+            return
+
+        total = 0
+        while True:
+            moved = self.archive_batch(queryset, batch_size)
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Перенесено: {total}')
+        self.stdout.write(self.style.SUCCESS(f'Готово, в архив перенесено {total} единиц'))
+
+    def get_cutoff(self, options):
+        if options['before']:
+            try:
+                return datetime.date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before должен быть датой в формате ГГГГ-ММ-ДД')
+        return timezone.localdate() - datetime.timedelta(days=options['days'])
+
+    def archivable(self, cutoff):
+        """Единицы, подлежащие переносу: проданные по дате продажи, прочие по дате создания"""
+        cutoff_start = timezone.make_aware(datetime.datetime.combine(cutoff, datetime.time.min))
+        statuses = [status for status in ProductUnit.ARCHIVABLE_STATUSES if status != 'sold']
+        return ProductUnit.objects.filter(
+            Q(status='sold', sale_date__lt=cutoff) |
+            Q(status__in=statuses, created_at__lt=cutoff_start)
+        )
+
+    def archive_batch(self, queryset, batch_size):
+        with transaction.atomic():
+            ids = list(
+                queryset.select_for_update().order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+            qn = connection.ops.quote_name
+            columns = ', '.join(qn(column) for column in COLUMNS)
+            # Позиция поставки - из самой единицы или из связи received_units,
+            # которая удаляется вместе с единицей
+            received = DeliveryItem.received_units.through._meta.db_table
+            selected = ', '.join(
+                f'COALESCE(unit.{qn(column)}, (SELECT MIN(link.{qn("deliveryitem_id")}) '
+                f'FROM {qn(received)} link WHERE link.{qn("productunit_id")} = unit.{qn("id")}))'
+                if column == 'delivery_item_id' else f'unit.{qn(column)}'
+                for column in COLUMNS
+            )
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {qn(ProductUnitArchive._meta.db_table)} '
+                    f'({columns}, archived_at) '
+                    f'SELECT {selected}, %s FROM {qn(ProductUnit._meta.db_table)} unit '
+                    f'WHERE unit.{qn("id")} IN ({placeholders})',
+                    [timezone.now(), *ids]
+                )
+            # Через ORM, чтобы снять строки связей M2M и сбросить кэш серийных номеров
+            ProductUnit.objects.filter(pk__in=ids).delete()
+        return len(ids)
@@ -0,0 +1,51 @@
+# app unit/management/commands/reconcile_stock
+"""
+Пересчёт остатков StockSummary по фактическим единицам товара.
+
+    python manage.py reconcile_stock
+
+Счётчики поддерживаются приращениями при каждой смене статуса; команда
+нужна после ручных правок в БД или для проверки расхождений (--check).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from unit.models import ProductUnit, StockSummary
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает остатки товаров по статусам единиц одним запросом'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сравнить с фактическими остатками, ничего не меняя'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatched = self.find_mismatches()
+            if mismatched:
+                raise CommandError(f"Расхождения по товарам: {', '.join(map(str, mismatched))}")
+            self.stdout.write(self.style.SUCCESS('Остатки совпадают'))
+            return
+        rows = StockSummary.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Остатки пересчитаны, товаров: {rows}'))
+
+    def find_mismatches(self):
+        statuses = [status for status, _ in ProductUnit.STATUS_CHOICES]
+        actual = {
+            row.pop('product_id'): row
+            for row in ProductUnit.objects.order_by().values('product_id').annotate(**{
+                status: Count('pk', filter=Q(status=status)) for status in statuses
+            })
+        }
+        stored = {
+            row.pop('product_id'): row
+            for row in StockSummary.objects.values('product_id', *statuses)
+        }
+        empty = dict.fromkeys(statuses, 0)
+        return sorted(
+            product_id for product_id in actual.keys() | stored.keys()
+            if actual.get(product_id, empty) != stored.get(product_id, empty)
+        )
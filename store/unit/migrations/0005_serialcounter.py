@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0006_product_fts'),
+        ('unit', '0004_alter_productunit_sale_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialCounter',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='serial_counter', serialize=False, to='goods.product', verbose_name='Товар')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Последний выданный номер')),
+            ],
+            options={
+                'verbose_name': 'Счётчик серийных номеров',
+                'verbose_name_plural': 'Счётчики серийных номеров',
+            },
+        ),
+    ]
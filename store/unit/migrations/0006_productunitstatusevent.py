@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('unit', '0005_serialcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductUnitStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'В заявке'), (2, 'В заявке - отменен'), (3, 'В магазине'), (4, 'Продан'), (5, 'Сломан'), (6, 'Утерян'), (7, 'Передан')], help_text='Пусто - единица создана', null=True, verbose_name='Из статуса')),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'В заявке'), (2, 'В заявке - отменен'), (3, 'В магазине'), (4, 'Продан'), (5, 'Сломан'), (6, 'Утерян'), (7, 'Передан')], verbose_name='В статус')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время')),
+                ('source_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ID документа')),
+                ('source_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype', verbose_name='Тип документа')),
+                ('unit', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='unit.productunit', verbose_name='Единица товара')),
+            ],
+            options={
+                'verbose_name': 'Смена статуса единицы',
+                'verbose_name_plural': 'Журнал статусов единиц',
+                'indexes': [models.Index(fields=['unit', 'created_at'], name='unit_produc_unit_id_5dad36_idx'), models.Index(fields=['created_at'], name='unit_produc_created_577c7b_idx')],
+            },
+        ),
+    ]
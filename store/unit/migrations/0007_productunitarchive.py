@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0006_product_fts'),
+        ('unit', '0006_productunitstatusevent'),
+        ('warehouse', '0003_remove_deliveryitem_notes_deliveryitem_request_item_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductUnitArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('serial_number', models.CharField(max_length=100, unique=True, verbose_name='Серийный номер')),
+                ('status', models.CharField(choices=[('in_request', 'В заявке'), ('in_request_cancelled', 'В заявке - отменен'), ('in_store', 'В магазине'), ('sold', 'Продан'), ('broken', 'Сломан'), ('lost', 'Утерян'), ('transferred', 'Передан')], max_length=20, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('sale_date', models.DateField(blank=True, null=True, verbose_name='Дата продажи')),
+                ('sale_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Цена продажи')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата переноса в архив')),
+                ('delivery_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='warehouse.deliveryitem', verbose_name='Позиция поставки')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_units', to='goods.product', verbose_name='Товар')),
+                ('request_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='warehouse.requestitem', verbose_name='Позиция заявки')),
+            ],
+            options={
+                'verbose_name': 'Архивная единица товара',
+                'verbose_name_plural': 'Архив единиц товаров',
+            },
+        ),
+    ]
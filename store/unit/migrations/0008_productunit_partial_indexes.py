@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0006_product_fts'),
+        ('unit', '0007_productunitarchive'),
+        ('warehouse', '0003_remove_deliveryitem_notes_deliveryitem_request_item_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productunit',
+            name='unit_produc_status_41544a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='productunit',
+            index=models.Index(condition=models.Q(('status', 'in_request')), fields=['request_item'], name='unit_in_request_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productunit',
+            index=models.Index(condition=models.Q(('status', 'in_store')), fields=['product'], name='unit_in_store_product_idx'),
+        ),
+    ]
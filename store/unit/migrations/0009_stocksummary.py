@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STATUSES = (
+    'in_request', 'in_request_cancelled', 'in_store', 'sold', 'broken', 'lost', 'transferred'
+)
+
+
+def fill_stock_summary(apps, schema_editor):
+    """Начальные остатки по существующим единицам (как StockSummary.rebuild)"""
+    sums = ', '.join(f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END)" for status in STATUSES)
+    schema_editor.execute(
+        f"INSERT INTO unit_stocksummary (product_id, {', '.join(STATUSES)}, updated_at) "
+        f"SELECT product_id, {sums}, CURRENT_TIMESTAMP FROM unit_productunit GROUP BY product_id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0006_product_fts'),
+        ('unit', '0008_productunit_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSummary',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_summary', serialize=False, to='goods.product', verbose_name='Товар')),
+                ('in_request', models.IntegerField(default=0, verbose_name='В заявке')),
+                ('in_request_cancelled', models.IntegerField(default=0, verbose_name='В заявке - отменен')),
+                ('in_store', models.IntegerField(default=0, verbose_name='В магазине')),
+                ('sold', models.IntegerField(default=0, verbose_name='Продан')),
+                ('broken', models.IntegerField(default=0, verbose_name='Сломан')),
+                ('lost', models.IntegerField(default=0, verbose_name='Утерян')),
+                ('transferred', models.IntegerField(default=0, verbose_name='Передан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Остаток товара',
+                'verbose_name_plural': 'Остатки товаров',
+            },
+        ),
+        migrations.RunPython(fill_stock_summary, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,270 @@
 # app unit/models
-from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.apps import apps
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q
 from django.core.exceptions import ValidationError
-import random
-from datetime import datetime
+from django.utils import timezone
+from .cache import invalidate_units_on_commit
 
 
+class SerialCounter(models.Model):
+    """
+    Счётчик серийных номеров товара.
+    Номера выдаются блоками: один UPDATE last_value = last_value + N
+    резервирует N номеров, без проверок существования и без гонок
+    между параллельными приёмками (строка счётчика блокируется UPDATE).
+    """
+    product = models.OneToOneField(
+        'goods.Product',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='serial_counter',
+        verbose_name='Товар'
+    )
+    last_value = models.PositiveBigIntegerField('Последний выданный номер', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик серийных номеров'
+        verbose_name_plural = 'Счётчики серийных номеров'
+
+    def __str__(self):
+        return f"{self.product_id}: {self.last_value}"
+
+    @classmethod
+    def allocate(cls, product_id, count=1):
+        """Резервирует count номеров подряд и возвращает их диапазон"""
+        if count <= 0:
+            return range(0)
+        with transaction.atomic():
+            counter = cls.objects.filter(product_id=product_id)
+            if not counter.update(last_value=F('last_value') + count):
+                # Первая выдача для товара: создаём счётчик, при гонке - повторяем UPDATE
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(product_id=product_id, last_value=count)
+                    return range(1, count + 1)
+                except IntegrityError:
+                    counter.update(last_value=F('last_value') + count)
+            last_value = counter.values_list('last_value', flat=True).get()
+        return range(last_value - count + 1, last_value + 1)
+
+
+# Сколько id попадает в один UPDATE (ограничение числа параметров SQLite)
+TRANSITION_CHUNK_SIZE = 500
+
+
+def _supports_update_returning():
+    """UPDATE ... RETURNING есть в PostgreSQL и в SQLite с версии 3.35"""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+class ProductUnitQuerySet(models.QuerySet):
+    def sale_items(self):
+        """
+        Позиции продаж по единицам выборки, кроме уже перенесённых в архив.
+        Внешний ключ SaleItem.product_unit без ограничения в БД (архив),
+        поэтому защиту от удаления проданных единиц держим здесь.
+        """
+        SaleItem = apps.get_model('sales', 'SaleItem')
+        return SaleItem.objects.filter(product_unit__in=self.values('pk')).exclude(
+            product_unit_id__in=ProductUnitArchive.objects.values('pk')
+        )
+
+    def check_deletable(self):
+        sale_items = list(self.sale_items()[:10])
+        if sale_items:
+            raise models.ProtectedError(
+                'Нельзя удалить единицы товара, по которым есть позиции продаж',
+                set(sale_items)
+            )
+
+    def delete(self):
+        # Счётчики StockSummary уменьшаются одной группировкой по удаляемым строкам
+        with transaction.atomic(using=self.db):
+            self.check_deletable()
+            counts = list(
+                self.order_by().values_list('product_id', 'status').annotate(count=Count('pk'))
+            )
+            result = super().delete()
+            StockSummary.apply(
+                (product_id, status, -count) for product_id, status, count in counts
+            )
+        return result
+
+    def with_purchase_price(self):
+        """Цена закупки из позиции поставки - JOIN вместо запроса на каждую строку"""
+        if 'purchase_price' in self.query.annotations:
+            return self
+        return self.annotate(purchase_price=F('delivery_item__price_per_unit'))
+
+    def with_margin(self):
+        """Маржа = цена продажи - цена закупки (NULL, если одной из цен нет)"""
+        return self.with_purchase_price().annotate(
+            margin=ExpressionWrapper(
+                F('sale_price') - F('purchase_price'),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+
+
+class ProductUnitManager(models.Manager.from_queryset(ProductUnitQuerySet)):
+    def create_batch(self, product, count, batch_size=1000, source=None, **fields):
+        """
+        Массовое создание count единиц товара: серийные номера резервируются
+        одним блоком, строки вставляются bulk_create пачками по batch_size,
+        всё в одной транзакции. Число запросов не зависит от count
+        (с точностью до числа пачек). source - документ-основание для журнала.
+        """
+        if count <= 0:
+            return []
+        with transaction.atomic():
+            serials = ProductUnit.generate_serial_numbers(product, count)
+            units = [
+                self.model(product=product, serial_number=serial, **fields)
+                for serial in serials
+            ]
+            units = self.bulk_create(units, batch_size=batch_size)
+            ProductUnitStatusEvent.record(
+                [(unit.pk, None, unit.status) for unit in units],
+                source=source,
+                batch_size=batch_size
+            )
+            StockSummary.apply([(product.pk, units[0].status, len(units))])
+            return units
+
+    def transition(self, ids, from_states, to_state, source=None, **fields):
+        """
+        Перевод единиц ids из статусов from_states в to_state.
+
+        Каждый переход проверяется по ProductUnit.STATUS_TRANSITIONS.
+        Обновление условное: UPDATE ... WHERE id IN (...) AND status = <из>,
+        поэтому единицы, которые успели сменить статус в другой транзакции,
+        просто не попадут в результат - блокировки на время работы Python
+        не нужны. fields - дополнительные поля (sale_date, delivery_item, ...).
+        Каждый переход пишется в журнал статусов и в счётчики StockSummary
+        в той же транзакции, source - документ-основание (продажа, поставка и т.п.).
+        Возвращает id единиц, которые действительно сменили статус.
+        """
+        if isinstance(from_states, str):
+            from_states = [from_states]
+        valid_states = dict(ProductUnit.STATUS_CHOICES)
+        if to_state not in valid_states:
+            raise ValidationError(f"Неизвестный статус: {to_state}")
+        for from_state in from_states:
+            if to_state not in ProductUnit.STATUS_TRANSITIONS.get(from_state, ()):
+                raise ValidationError(
+                    f"Недопустимый переход статуса: {from_state} -> {to_state}"
+                )
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+
+        assignments = self._transition_assignments(to_state, fields)
+        moved = []
+        with transaction.atomic():
+            # Отдельный UPDATE на каждый исходный статус: так известно,
+            # из какого статуса ушла каждая строка
+            for from_state in from_states:
+                for start in range(0, len(ids), TRANSITION_CHUNK_SIZE):
+                    chunk = ids[start:start + TRANSITION_CHUNK_SIZE]
+                    for unit_id, product_id in self._update_returning(chunk, from_state, assignments):
+                        moved.append((unit_id, product_id, from_state))
+            ProductUnitStatusEvent.record(
+                [(unit_id, from_state, to_state) for unit_id, _, from_state in moved],
+                source=source
+            )
+            StockSummary.apply(
+                change
+                for _, product_id, from_state in moved
+                for change in ((product_id, from_state, -1), (product_id, to_state, 1))
+            )
+            invalidate_units_on_commit(unit_id for unit_id, _, _ in moved)
+        return [unit_id for unit_id, _, _ in moved]
+
+    def _transition_assignments(self, to_state, fields):
+        """Пары (столбец, значение для БД) для SET"""
+        opts = self.model._meta
+        assignments = [(opts.get_field('status').column, to_state)]
+        for name, value in fields.items():
+            field = opts.get_field(name)
+            if not field.concrete or field.primary_key or name == 'status':
+                raise ValueError(f"Поле {name} нельзя менять при смене статуса")
+            if isinstance(value, models.Model):
+                value = value.pk
+            assignments.append((field.column, field.get_db_prep_save(value, connection)))
+        return assignments
+
+    def _update_returning(self, ids, from_state, assignments):
+        """
+        Условный UPDATE одной пачки. Возвращает [(id, product_id)] перемещённых
+        строк: через RETURNING, а где его нет - выборкой под select_for_update
+        в той же транзакции.
+        """
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        status_column = qn(opts.get_field('status').column)
+        product_column = qn(opts.get_field('product').column)
+        pk_column = qn(opts.pk.column)
+
+        if not _supports_update_returning():
+            rows = list(
+                self.select_for_update()
+                .filter(pk__in=ids, status=from_state)
+                .values_list('pk', 'product_id')
+            )
+            ids = [row[0] for row in rows]
+            if not ids:
+                return []
+
+        placeholders = ', '.join(['%s'] * len(ids))
+        sql = 'UPDATE {table} SET {set} WHERE {pk} IN ({ids}) AND {status} = %s'.format(
+            table=qn(opts.db_table),
+            set=', '.join(f'{qn(column)} = %s' for column, _ in assignments),
+            pk=pk_column,
+            ids=placeholders,
+            status=status_column,
+        )
+        params = [value for _, value in assignments] + ids + [from_state]
+        with connection.cursor() as cursor:
+            if _supports_update_returning():
+                cursor.execute(f'{sql} RETURNING {pk_column}, {product_column}', params)
+                return cursor.fetchall()
+            cursor.execute(sql, params)
+        return rows
+
+
+class AllProductUnitsManager(models.Manager):
+    """
+    ProductUnit.all_objects: живые и архивные единицы одной выборкой
+    (UNION ALL ProductUnit и ProductUnitArchive) - для исторических запросов.
+    Объединённую выборку Django фильтровать не умеет, поэтому условия
+    передаются в filter() и применяются к обеим частям до объединения:
+
+        ProductUnit.all_objects.filter(product=product).order_by('-created_at')
+        ProductUnit.all_objects.filter(pk=unit_id).get()
+
+    Строки - экземпляры ProductUnit только для чтения, archived_at заполнен
+    у архивных. Представления в БД нет: схема ProductUnit меняется обычными
+    миграциями.
+    """
+
+    def get_queryset(self):
+        return self.filter()
+
+    def filter(self, *args, **kwargs):
+        live = ProductUnit.objects.filter(*args, **kwargs).annotate(
+            archived_at=models.Value(None, output_field=models.DateTimeField())
+        )
+        archived = ProductUnitArchive.objects.filter(*args, **kwargs)
+        # Столбцы архива идут в том же порядке, что и у ProductUnit + archived_at
+        return live.union(archived, all=True)
 
 
 class ProductUnit(models.Model):
@@ -18,24 +278,49 @@ class ProductUnit(models.Model):
         ('transferred', 'Передан'),
     ]
 
-    @staticmethod
-    def generate_serial_number(product):
-        """Генерация гарантированно уникального серийного номера"""
-        max_attempts = 100
-        base_prefix = f"RF-{product.id}-"
+    # Компактные коды статусов для журнала ProductUnitStatusEvent.
+    # Коды не меняются: новые статусы получают следующие номера.
+    STATUS_CODES = {
+        'in_request': 1,
+        'in_request_cancelled': 2,
+        'in_store': 3,
+        'sold': 4,
+        'broken': 5,
+        'lost': 6,
+        'transferred': 7,
+    }
 
-        for attempt in range(max_attempts):
-            timestamp = datetime.now().strftime("%d%m:%H%M%S")
-            # Добавляем микросекунды и attempt для уникальности
-            unique_part = f"{datetime.now().microsecond:06d}{attempt:02d}"[:8]
-            full_serial = f"{base_prefix}{timestamp}-{unique_part}"
+    # Статусы, единицы в которых больше не участвуют в работе
+    # и со временем переносятся в архив (manage.py archive_units)
+    ARCHIVABLE_STATUSES = ('sold', 'lost', 'in_request_cancelled')
 
-            if not ProductUnit.objects.filter(serial_number=full_serial).exists():
-                return full_serial
+    # Допустимые переходы статусов: откуда -> куда
+    STATUS_TRANSITIONS = {
+        'in_request': ('in_store', 'in_request_cancelled'),
+        'in_request_cancelled': ('in_request',),
+        'in_store': ('sold', 'broken', 'lost', 'transferred', 'in_request'),  # + отмена приёмки
+        'sold': ('in_store',),  # отмена продажи / возврат
+        'broken': ('in_store', 'lost'),
+        'lost': ('in_store',),
+        'transferred': ('in_store',),
+    }
 
-        raise ValidationError(
-            f"Не удалось сгенерировать уникальный номер после {max_attempts} попыток"
-        )
+    @staticmethod
+    def format_serial_number(product_id, number):
+        return f"RF-{product_id}-{number:06d}"
+
+    @staticmethod
+    def generate_serial_numbers(product, count):
+        """Блок из count уникальных серийных номеров за одно обращение к счётчику"""
+        return [
+            ProductUnit.format_serial_number(product.pk, number)
+            for number in SerialCounter.allocate(product.pk, count)
+        ]
+
+    @staticmethod
+    def generate_serial_number(product):
+        """Генерация гарантированно уникального серийного номера"""
+        return ProductUnit.generate_serial_numbers(product, 1)[0]
 
     serial_number = models.CharField(
         'Серийный номер',
@@ -85,12 +370,28 @@ class ProductUnit(models.Model):
         blank=True,
         help_text='Цена продажи (если товар продан)'
     )
+
+    objects = ProductUnitManager()
+    all_objects = AllProductUnitsManager()
+
     class Meta:
         verbose_name = 'Единица товара'
         verbose_name_plural = 'Единицы товаров'
         indexes = [
-            models.Index(fields=['status', 'product']),
             models.Index(fields=['sale_date']),
+            # Частичные индексы только по активным единицам вместо общего
+            # (status, product): не растут вместе с проданными
+            # (scripts/bench_unit_indexes.py)
+            models.Index(
+                fields=['request_item'],
+                condition=Q(status='in_request'),
+                name='unit_in_request_idx'
+            ),
+            models.Index(
+                fields=['product'],
+                condition=Q(status='in_store'),
+                name='unit_in_store_product_idx'
+            ),
         ]
 
     def safe_mark_as_sold(self, sale_date=None, sale_price=None):
@@ -98,16 +399,26 @@ class ProductUnit(models.Model):
         Безопасное изменение статуса на 'sold' без обязательных параметров
         Новый метод - можно вызывать даже без указания даты/цены
         """
-        self.status = 'sold'
+        fields = {}
         if sale_date:
-            self.sale_date = sale_date
+            fields['sale_date'] = sale_date
         if sale_price:
-            self.sale_price = sale_price
-        self.save()
+            fields['sale_price'] = sale_price
+        if ProductUnit.objects.transition([self.pk], ['in_store'], 'sold', **fields):
+            self.status = 'sold'
+            for name, value in fields.items():
+                setattr(self, name, value)
+        elif self.status != 'sold':
+            raise ValidationError(
+                f"Нельзя продать единицу {self.serial_number} со статусом {self.get_status_display()}"
+            )
         return self
 
     def get_purchase_price(self):
         """Возвращает цену закупки (из DeliveryItem)"""
+        # Выборки через with_purchase_price() уже содержат цену
+        if 'purchase_price' in self.__dict__:
+            return self.purchase_price
         if self.delivery_item:
             return self.delivery_item.price_per_unit
         return None
@@ -118,9 +429,253 @@ class ProductUnit(models.Model):
             return f"{base_str} - {self.sale_date}"
         return base_str
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем статус и товар из БД, чтобы save() мог записать переход
+        # в журнал и поправить счётчики StockSummary
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_product_id = instance.__dict__.get('product_id')
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.serial_number:
             if not self.product:
                 raise ValidationError("Нельзя создать единицу товара без указания товара")
             self.serial_number = ProductUnit.generate_serial_number(self.product)
-        super().save(*args, **kwargs)
\ No newline at end of file
+
+        adding = self._state.adding
+        from_status = None if adding else getattr(self, '_loaded_status', None)
+        from_product_id = getattr(self, '_loaded_product_id', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding or from_status != self.status:
+                ProductUnitStatusEvent.record([(self.pk, from_status, self.status)])
+            if adding:
+                StockSummary.apply([(self.product_id, self.status, 1)])
+            elif from_status and (from_status, from_product_id) != (self.status, self.product_id):
+                StockSummary.apply([
+                    (from_product_id, from_status, -1),
+                    (self.product_id, self.status, 1)
+                ])
+            if not adding:
+                invalidate_units_on_commit([self.pk])
+        self._loaded_status = self.status
+        self._loaded_product_id = self.product_id
+
+    def delete(self, *args, **kwargs):
+        status = getattr(self, '_loaded_status', None) or self.status
+        product_id = getattr(self, '_loaded_product_id', None) or self.product_id
+        with transaction.atomic():
+            ProductUnit.objects.filter(pk=self.pk).check_deletable()
+            result = super().delete(*args, **kwargs)
+            StockSummary.apply([(product_id, status, -1)])
+        return result
+
+
+class ProductUnitStatusEvent(models.Model):
+    """
+    Журнал смены статусов единиц товара (только добавление).
+    Статусы хранятся кодами ProductUnit.STATUS_CODES; индексы (unit, created_at)
+    и (created_at) дают историю единицы или "всё за день" одним диапазоном.
+    """
+    STATUS_CODE_CHOICES = [
+        (ProductUnit.STATUS_CODES[status], label) for status, label in ProductUnit.STATUS_CHOICES
+    ]
+
+    # Без ограничения внешнего ключа: журнал переживает удаление единицы
+    unit = models.ForeignKey(
+        ProductUnit,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='status_events',
+        verbose_name='Единица товара'
+    )
+    from_status = models.PositiveSmallIntegerField(
+        'Из статуса',
+        choices=STATUS_CODE_CHOICES,
+        null=True,
+        blank=True,
+        help_text='Пусто - единица создана'
+    )
+    to_status = models.PositiveSmallIntegerField('В статус', choices=STATUS_CODE_CHOICES)
+    created_at = models.DateTimeField('Время', default=timezone.now)
+    source_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Тип документа'
+    )
+    source_id = models.PositiveBigIntegerField('ID документа', null=True, blank=True)
+    source = GenericForeignKey('source_type', 'source_id')
+
+    class Meta:
+        verbose_name = 'Смена статуса единицы'
+        verbose_name_plural = 'Журнал статусов единиц'
+        indexes = [
+            models.Index(fields=['unit', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.unit_id}: {self.get_from_status_display()} -> {self.get_to_status_display()}"
+
+    @classmethod
+    def record(cls, changes, source=None, batch_size=1000):
+        """
+        Пишет пачку переходов [(unit_id, из статуса или None, в статус)]
+        одним bulk_create с общим временем и документом-основанием.
+        """
+        codes = ProductUnit.STATUS_CODES
+        now = timezone.now()
+        source_type = ContentType.objects.get_for_model(source) if source is not None else None
+        source_id = source.pk if source is not None else None
+        events = [
+            cls(
+                unit_id=unit_id,
+                from_status=codes[from_status] if from_status else None,
+                to_status=codes[to_status],
+                created_at=now,
+                source_type=source_type,
+                source_id=source_id
+            )
+            for unit_id, from_status, to_status in changes
+        ]
+        if events:
+            cls.objects.bulk_create(events, batch_size=batch_size)
+
+
+class StockSummary(models.Model):
+    """
+    Остатки товара по статусам единиц - денормализованные счётчики.
+    Меняются в той же транзакции, что и единицы (create_batch, transition,
+    ProductUnit.save/delete), приращениями F(): одна строка на товар вместо
+    COUNT(*) по ProductUnit. Считаются единицы рабочей таблицы - архивные
+    (archive_units) сюда не входят. Пересчёт с нуля: manage.py reconcile_stock.
+    """
+    product = models.OneToOneField(
+        'goods.Product',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stock_summary',
+        verbose_name='Товар'
+    )
+    in_request = models.IntegerField('В заявке', default=0)
+    in_request_cancelled = models.IntegerField('В заявке - отменен', default=0)
+    in_store = models.IntegerField('В магазине', default=0)
+    sold = models.IntegerField('Продан', default=0)
+    broken = models.IntegerField('Сломан', default=0)
+    lost = models.IntegerField('Утерян', default=0)
+    transferred = models.IntegerField('Передан', default=0)
+    # Для ETag/Last-Modified ответов API с ?expand=stock
+    updated_at = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Остаток товара'
+        verbose_name_plural = 'Остатки товаров'
+
+    def __str__(self):
+        return f"{self.product_id}: в магазине {self.in_store}, в заявке {self.in_request}"
+
+    @classmethod
+    def apply(cls, changes):
+        """
+        Применяет приращения [(product_id, статус, дельта)]:
+        один UPDATE на товар, строка создаётся при первом изменении
+        """
+        by_product = {}
+        for product_id, status, delta in changes:
+            counts = by_product.setdefault(product_id, {})
+            counts[status] = counts.get(status, 0) + delta
+        if not by_product:
+            return
+        with transaction.atomic():
+            for product_id, counts in by_product.items():
+                counts = {status: delta for status, delta in counts.items() if delta}
+                if not counts:
+                    continue
+                summary = cls.objects.filter(product_id=product_id)
+                increments = {status: F(status) + delta for status, delta in counts.items()}
+                increments['updated_at'] = timezone.now()
+                if summary.update(**increments):
+                    continue
+                # Первое изменение по товару, при гонке - повторяем UPDATE
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(product_id=product_id, **counts)
+                except IntegrityError:
+                    summary.update(**increments)
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчёт всех счётчиков одним INSERT ... SELECT ... GROUP BY"""
+        qn = connection.ops.quote_name
+        statuses = [status for status, _ in ProductUnit.STATUS_CHOICES]
+        columns = ', '.join(qn(status) for status in statuses)
+        sums = ', '.join(
+            f"SUM(CASE WHEN {qn('status')} = %s THEN 1 ELSE 0 END)" for _ in statuses
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {qn(cls._meta.db_table)} ({qn('product_id')}, {columns}, {qn('updated_at')}) "
+                    f"SELECT {qn('product_id')}, {sums}, %s FROM {qn(ProductUnit._meta.db_table)} "
+                    f"GROUP BY {qn('product_id')}",
+                    statuses + [cls._meta.get_field('updated_at').get_db_prep_save(timezone.now(), connection)]
+                )
+                return cursor.rowcount
+
+
+class ProductUnitArchive(models.Model):
+    """
+    Архив завершённых единиц товара (проданные, утерянные, отменённые).
+    Строки переносятся из ProductUnit с тем же id командой archive_units,
+    чтобы рабочая таблица и её индексы содержали только активный запас.
+    Набор и порядок столбцов повторяют ProductUnit: на этом построено
+    объединение ProductUnit.all_objects.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    serial_number = models.CharField('Серийный номер', max_length=100, unique=True)
+    product = models.ForeignKey(
+        'goods.Product',
+        on_delete=models.PROTECT,
+        related_name='archived_units',
+        verbose_name='Товар'
+    )
+    request_item = models.ForeignKey(
+        'warehouse.RequestItem',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Позиция заявки'
+    )
+    delivery_item = models.ForeignKey(
+        'warehouse.DeliveryItem',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Позиция поставки'
+    )
+    status = models.CharField('Статус', max_length=20, choices=ProductUnit.STATUS_CHOICES)
+    created_at = models.DateTimeField('Дата создания')
+    sale_date = models.DateField('Дата продажи', null=True, blank=True)
+    sale_price = models.DecimalField(
+        'Цена продажи',
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    archived_at = models.DateTimeField('Дата переноса в архив', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Архивная единица товара'
+        verbose_name_plural = 'Архив единиц товаров'
+
+    def __str__(self):
+        return f"{self.serial_number} ({self.get_status_display()}, архив)"
@@ -0,0 +1,17 @@
+# app unit/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import serial_cache
+from .models import ProductUnit
+
+
+@receiver(post_delete, sender=ProductUnit)
+def forget_deleted_unit(sender, instance, **kwargs):
+    serial_cache.invalidate_ids([instance.pk])
+
+
+@receiver(post_save, sender='goods.Product')
+def forget_product_units(sender, instance, **kwargs):
+    # В кэше лежат название и код товара; правки товаров редки - сбрасываем целиком
+    serial_cache.clear()
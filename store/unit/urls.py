@@ -0,0 +1,9 @@
+#  app unit\urls
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('units/by-serial/', views.unit_batch_by_serial, name='unit-batch-by-serial'),
+    path('units/by-serial/<str:serial>/', views.unit_by_serial, name='unit-by-serial'),
+    path('reports/margin/', views.margin_report, name='margin-report'),
+]
@@ -1,3 +1,122 @@
-from django.shortcuts import render
+# app unit/views
+import json
 
-# Create your views here.
+from django.db.models import Count, Sum
+from django.utils.dateparse import parse_date
+
+from store.renderers import JSONResponse
+from .cache import serial_cache
+from .models import ProductUnit
+
+# Предел серийных номеров в одном пакетном запросе сканера
+MAX_SERIAL_BATCH = 500
+
+
+def _serialize_unit(row):
+    return {
+        'id': row['id'],
+        'serial_number': row['serial_number'],
+        'status': row['status'],
+        'sale_date': row['sale_date'],
+        'sale_price': row['sale_price'],
+        'product': {
+            'id': row['product_id'],
+            'code': row['product__code'],
+            'name': row['product__name'],
+        },
+    }
+
+
+def lookup_units(serials):
+    """
+    Единицы по серийным номерам: сначала кэш, остальное -
+    одним запросом по уникальному индексу serial_number с JOIN товара.
+    Возвращает словарь serial -> данные (ненайденных в нём нет).
+    """
+    found = {}
+    misses = []
+    for serial in serials:
+        cached = serial_cache.get(serial)
+        if cached is None:
+            misses.append(serial)
+        else:
+            found[serial] = cached
+
+    if misses:
+        rows = ProductUnit.objects.filter(serial_number__in=misses).values(
+            'id', 'serial_number', 'status', 'sale_date', 'sale_price',
+            'product_id', 'product__code', 'product__name'
+        )
+        for row in rows:
+            data = _serialize_unit(row)
+            serial_cache.set(row['serial_number'], data)
+            found[row['serial_number']] = data
+    return found
+
+
+def unit_by_serial(request, serial):
+    found = lookup_units([serial])
+    if serial not in found:
+        return JSONResponse({'error': 'Not found'}, status=404)
+    return JSONResponse(found[serial])
+
+
+def unit_batch_by_serial(request):
+    """
+    Пакетный поиск для сканеров с буфером:
+    GET ?serials=A,B,C или POST {"serials": [...]}
+    """
+    if request.method == 'POST':
+        try:
+            serials = json.loads(request.body).get('serials', [])
+        except (ValueError, AttributeError):
+            return JSONResponse({'error': 'Некорректный JSON'}, status=400)
+        if not isinstance(serials, list) or not all(isinstance(s, str) for s in serials):
+            return JSONResponse({'error': 'serials должен быть списком строк'}, status=400)
+    else:
+        serials = [s for s in request.GET.get('serials', '').split(',') if s]
+
+    serials = list(dict.fromkeys(serials))
+    if not serials:
+        return JSONResponse({'error': 'Укажите serials'}, status=400)
+    if len(serials) > MAX_SERIAL_BATCH:
+        return JSONResponse({'error': f'Не больше {MAX_SERIAL_BATCH} номеров за запрос'}, status=400)
+
+    found = lookup_units(serials)
+    return JSONResponse({
+        'results': found,
+        'missing': [serial for serial in serials if serial not in found],
+    })
+
+
+def margin_report(request):
+    """
+    Маржа по проданным единицам в разрезе товаров одним запросом:
+    ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD (по sale_date), ?product=<id>
+    """
+    units = ProductUnit.objects.filter(status='sold')
+    for param, lookup in (('date_from', 'sale_date__gte'), ('date_to', 'sale_date__lte')):
+        if request.GET.get(param):
+            value = parse_date(request.GET[param])
+            if value is None:
+                return JSONResponse({'error': f'Некорректная дата {param}'}, status=400)
+            units = units.filter(**{lookup: value})
+    if request.GET.get('product'):
+        try:
+            product_id = int(request.GET['product'])
+        except ValueError:
+            return JSONResponse({'error': 'product должен быть целым числом'}, status=400)
+        units = units.filter(product_id=product_id)
+
+    rows = list(
+        units.with_margin()
+        .values('product_id', 'product__code', 'product__name')
+        .annotate(
+            units=Count('id'),
+            revenue=Sum('sale_price'),
+            cost=Sum('purchase_price'),
+            margin=Sum('margin')
+        )
+        .order_by('product__name')
+    )
+    return JSONResponse(rows, safe=False)
@@ -1,9 +1,10 @@
 # app warehouse/admin.py
 from django.contrib import admin
-from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from django.db.models import F, Sum, Q
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from .models import Delivery, DeliveryItem, Request, RequestItem, Supplier, Customer
+from .receiving import receive_delivery_item
 from unit.models import ProductUnit
 from django import forms
 from django.contrib import messages
@@ -47,8 +48,6 @@ class DeliveryItemForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if 'request_item' in self.fields:
-            self.fields['request_item'].label_from_instance = lambda obj: format_html("Z-{}", f"{obj.id:03d}")
 
         # Фильтрация для received_units
         if self.instance and self.instance.pk:
@@ -67,47 +66,22 @@ class DeliveryItemForm(forms.ModelForm):
         if not quantity_received or quantity_received <= 0:
             raise forms.ValidationError("Укажите положительное количество")
 
-        if product and quantity_received:
-            try:
-                for _ in range(quantity_received):
-                    ProductUnit.generate_serial_number(product)
-            except ValidationError as e:
-                raise forms.ValidationError(
-                    f"Ошибка генерации серийных номеров: {str(e)}"
-                )
+        # Серийные номера выдаются блоком при сохранении (SerialCounter),
+        # поэтому здесь только дешёвые проверки выбора - без перебора номеров
+        selected = cleaned_data.get('received_units')
+        if product and selected is not None:
+            if selected.exclude(product=product).exists():
+                raise forms.ValidationError("Выбраны единицы другого товара")
+            if selected.count() > quantity_received:
+                raise forms.ValidationError("Выбрано больше единиц, чем получено")
         return cleaned_data
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-
-        if commit and instance.product and instance.quantity_received:
-            units = []
-            error = None
-            for _ in range(instance.quantity_received):
-                try:
-                    unit = ProductUnit(
-                        product=instance.product,
-                        status='in_stock',
-                        request_item=instance.request_item,
-                        delivery_item=instance
-                    )
-                    unit.save()
-                    units.append(unit)
-                except ValidationError as e:
-                    error = e
-                    continue
-
-            if len(units) < instance.quantity_received:
-                raise forms.ValidationError(
-                    f"Удалось создать только {len(units)} из {instance.quantity_received} единиц товара. "
-                    f"Причина: {str(error)}" if error else "Неизвестная ошибка"
-                )
-
-            instance.received_units.set(units)
-
-        if commit:
-            instance.save()
-        return instance
+    def _save_m2m(self):
+        # received_units сохраняет сервис приёмки вместо ModelForm: переводит
+        # выбранные единицы в магазин и досоздаёт недостающие одной пачкой
+        selected = self.cleaned_data.pop('received_units', None)
+        super()._save_m2m()
+        receive_delivery_item(self.instance, selected)
 
 
 # ========== INLINE ДЛЯ ПОЗИЦИЙ ПОСТАВКИ ==========
@@ -125,7 +99,21 @@ class DeliveryItemInline(admin.TabularInline):
         'completion_status'
     )
     readonly_fields = ('total_price', 'completion_status')
-    filter_horizontal = ('received_units',)
+    # Поиск с подгрузкой страницами вместо списка всех товаров и единиц
+    # в каждой строке (единицы - только 'in_request', см. ProductUnitAdmin),
+    # позиция заявки - по номеру, без выпадающего списка всех заявок
+    autocomplete_fields = ('product', 'received_units')
+    raw_id_fields = ('request_item',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'product', 'request_item', 'delivery'
+        ).annotate(
+            received_count=Count('received_units')
+        ).prefetch_related(
+            # Выбранные значения виджета - одним запросом на всю поставку
+            Prefetch('received_units', queryset=ProductUnit.objects.only('id', 'serial_number', 'status', 'sale_date'))
+        )
 
     def total_price(self, obj):
         if obj.quantity_received and obj.price_per_unit:
@@ -136,7 +124,10 @@ class DeliveryItemInline(admin.TabularInline):
 
     def completion_status(self, obj):
         if obj.request_item:
-            return f"{obj.received_units.count()} из {obj.request_item.quantity_ordered}"
+            received = getattr(obj, 'received_count', None)
+            if received is None:
+                received = obj.received_units.count()
+            return f"{received} из {obj.request_item.quantity_ordered}"
         return "—"
 
     completion_status.short_description = 'Выполнено'
@@ -155,14 +146,20 @@ class DeliveryAdmin(admin.ModelAdmin):
         'items_count'
     )
     list_filter = ('supplier', 'delivery_date')
+    list_select_related = ('supplier',)
     search_fields = ('supplier__name', 'notes')
     date_hierarchy = 'delivery_date'
     readonly_fields = ('total_amount_display',)
+    # Сумму ведут позиции поставки (DeliveryItem.save/delete)
+    exclude = ('total_amount',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(items_total=Count('items'))
 
     def supplier_link(self, obj):
         return format_html(
             '<a href="/admin/warehouse/supplier/{}/change/">{}</a>',
-            obj.supplier.id,
+            obj.supplier_id,
             obj.supplier.name
         )
 
@@ -184,20 +181,15 @@ class DeliveryAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Статус'
 
     def items_count(self, obj):
-        return obj.items.count()
+        return obj.items_total
 
     items_count.short_description = 'Позиций'
+    items_count.admin_order_field = 'items_total'
 
     def save_related(self, request, form, formsets, change):
         try:
+            # Сумма поставки уже обновлена приращениями при сохранении позиций
             super().save_related(request, form, formsets, change)
-            total = sum(
-                item.quantity_received * item.price_per_unit
-                for item in form.instance.items.all()
-                if item.quantity_received and item.price_per_unit
-            )
-            form.instance.total_amount = total
-            form.instance.save()
         except Exception as e:
             messages.error(request, f"Ошибка сохранения связанных данных: {str(e)}")
             raise
@@ -240,6 +232,36 @@ class RequestAdmin(BaseAdmin):
     search_fields = ('id', 'items__product__name')
     date_hierarchy = 'created_at'
 
+    def get_queryset(self, request):
+        """
+        Итоги по заявке - коррелированными подзапросами, каждый агрегирует
+        свою таблицу отдельно: JOIN позиций с поставками умножал бы
+        заказанное количество на число поставок позиции
+        """
+        items = RequestItem.objects.filter(request=OuterRef('pk')).order_by().values('request')
+        deliveries = (
+            DeliveryItem.objects.filter(request_item__request=OuterRef('pk'))
+            .order_by().values('request_item__request')
+        )
+        return super().get_queryset(request).annotate(
+            items_total=Subquery(
+                items.annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField()
+            ),
+            sum_total=Subquery(
+                items.annotate(total=Sum(F('quantity_ordered') * F('price_per_unit'))).values('total'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            ),
+            ordered_total=Coalesce(
+                Subquery(items.annotate(total=Sum('quantity_ordered')).values('total')),
+                Value(0)
+            ),
+            received_total=Coalesce(
+                Subquery(deliveries.annotate(total=Sum('quantity_received')).values('total')),
+                Value(0)
+            ),
+        )
+
     def id_formatted(self, obj):
         return format_html("<b>Z-{}</b>", f"{obj.id:03d}")
 
@@ -247,26 +269,21 @@ class RequestAdmin(BaseAdmin):
     id_formatted.admin_order_field = 'id'
 
     def total_sum(self, obj):
-        result = obj.items.aggregate(
-            total=Sum(F('quantity_ordered') * F('price_per_unit'))
-        )['total']
+        result = obj.sum_total
         return f"{result:.2f} ₽" if result else "—"
 
     total_sum.short_description = 'Общая сумма'
+    total_sum.admin_order_field = 'sum_total'
 
     def items_count(self, obj):
-        return obj.items.count()
+        return obj.items_total or 0
 
     items_count.short_description = 'Позиций'
+    items_count.admin_order_field = 'items_total'
 
     def completion_status(self, obj):
-        items_data = obj.items.aggregate(
-            total_ordered=Sum('quantity_ordered'),
-            total_received=Sum('delivery_items__quantity_received')
-        )
-
-        total_ordered = items_data['total_ordered'] or 0
-        total_received = items_data['total_received'] or 0
+        total_ordered = obj.ordered_total
+        total_received = obj.received_total
 
         if total_ordered == 0:
             return "Нет данных"
@@ -1,6 +1,7 @@
 # app warehouse/models
-from django.db import models
+from django.db import models, transaction
 from unit.models import ProductUnit
+from store.totals import TotalDocumentMixin, TotalLineMixin
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 
@@ -36,7 +37,7 @@ class Supplier(models.Model):
         return f"{self.name} ({self.contact_person})"
 
 
-class Delivery(models.Model):
+class Delivery(TotalDocumentMixin, models.Model):
     """Поставка (заголовок)"""
     supplier = models.ForeignKey(
         Supplier,
@@ -61,7 +62,7 @@ class Delivery(models.Model):
         return f"Поставка #{self.id} от {self.delivery_date}"
 
 
-class DeliveryItem(models.Model):
+class DeliveryItem(TotalLineMixin, models.Model):
     delivery = models.ForeignKey(
         'warehouse.Delivery',
         on_delete=models.CASCADE,
@@ -103,6 +104,10 @@ class DeliveryItem(models.Model):
         verbose_name_plural = 'Позиции поставок'
         ordering = ['delivery', 'product']
 
+    # Вклад в Delivery.total_amount
+    total_document_field = 'delivery'
+    total_fields = ('quantity_received', 'price_per_unit')
+
     def __str__(self):
         return f"{self.product.name} x {self.quantity_received} (Поставка #{self.delivery.id})"
 
@@ -116,14 +121,27 @@ class DeliveryItem(models.Model):
             raise ValidationError({'quantity_received': 'Количество должно быть положительным'})
 
     def save(self, *args, **kwargs):
-        """Автоматическое обновление статусов ProductUnit при сохранении"""
-        super().save(*args, **kwargs)
-
-        # Обновляем статус всех привязанных единиц
-        for unit in self.received_units.all():
-            unit.status = 'in_store'
-            unit.delivery_item = self
-            unit.save()
+        """Автоматическое обновление статусов ProductUnit и суммы поставки при сохранении"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_received_units()
+
+    def update_received_units(self):
+        """
+        Приводит полученные единицы к статусу 'in_store' и этой позиции поставки.
+        Меняются только отличающиеся строки: единицы из заявки - условным
+        переходом (журнал статусов и StockSummary), уже принятым с другой
+        позицией - одним UPDATE позиции. Повторное сохранение без изменений
+        ничего не пишет.
+        """
+        units = self.received_units.all()
+        ProductUnit.objects.transition(
+            units.filter(status='in_request').values_list('pk', flat=True),
+            ['in_request'], 'in_store',
+            source=self,
+            delivery_item=self
+        )
+        units.filter(status='in_store').exclude(delivery_item=self).update(delivery_item=self)
 
     @property
     def total_price(self):
@@ -191,18 +209,46 @@ class RequestItem(models.Model):
         verbose_name_plural = 'Позиции заявок'
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.is_customer_order:
-            try:
-                for i in range(self.quantity_ordered):
-                    ProductUnit.objects.create(
-                        product=self.product,
-                        serial_number=f"{self.product.code}-{i + 1:03d}",
-                        status='in_request',
-                        request_item=self
-                    )
-            except ValidationError as e:
-                raise ValidationError(f"Ошибка создания единицы товара: {str(e)}")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_reserved_units()
+
+    def sync_reserved_units(self):
+        """
+        Приводит число единиц позиции к quantity_ordered.
+        Учитываются все единицы позиции, кроме отменённых (полученные и
+        проданные тоже). Недостача: сначала возвращаются отменённые единицы,
+        остальные создаются одним create_batch. Излишек: лишние единицы
+        в статусе 'in_request' отменяются, уже полученные не трогаются.
+        Повторное сохранение без изменений - один запрос подсчёта.
+        """
+        units = ProductUnit.objects.filter(request_item=self)
+        reserved = units.exclude(status='in_request_cancelled').count()
+        shortfall = self.quantity_ordered - reserved
+
+        if shortfall > 0:
+            cancelled = list(
+                units.filter(status='in_request_cancelled')
+                .order_by('pk').values_list('pk', flat=True)[:shortfall]
+            )
+            restored = ProductUnit.objects.transition(
+                cancelled, ['in_request_cancelled'], 'in_request', source=self
+            )
+            ProductUnit.objects.create_batch(
+                self.product,
+                shortfall - len(restored),
+                status='in_request',
+                request_item=self,
+                source=self
+            )
+        elif shortfall < 0:
+            surplus = list(
+                units.filter(status='in_request')
+                .order_by('-pk').values_list('pk', flat=True)[:-shortfall]
+            )
+            ProductUnit.objects.transition(
+                surplus, ['in_request'], 'in_request_cancelled', source=self
+            )
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity_ordered}"
\ No newline at end of file
@@ -0,0 +1,112 @@
+# app warehouse/receiving
+"""
+Приёмка позиции поставки.
+
+Единицы, выбранные в форме, и зарезервированные под позицию заявки
+(статус 'in_request') переводятся в магазин условным UPDATE, недостающие
+до quantity_received создаются create_batch (серийные номера блоком),
+связи received_units пишутся одним bulk_create строк M2M. Снятые с позиции
+единицы откатываются: из заявки - обратно в 'in_request', созданные
+приёмкой - удаляются. Принятыми считаются все единицы с этой позицией
+поставки, включая перенесённые в архив (archive_units), а не только
+связанные через M2M. Число запросов не зависит от количества единиц
+(с точностью до пачек).
+"""
+from django.db import transaction
+
+from unit.models import ProductUnit, ProductUnitArchive
+
+from .models import DeliveryItem
+
+ReceivedUnit = DeliveryItem.received_units.through
+
+
+def release_units(item, unit_ids):
+    """
+    Откат приёмки единиц unit_ids позиции item (они уже отвязаны от M2M).
+    Единицы заявки возвращаются в 'in_request', остальные удаляются;
+    позиция поставки снимается в обоих случаях. Уже проданные и прочие
+    не находящиеся в магазине единицы не трогаются.
+    """
+    units = ProductUnit.objects.filter(pk__in=unit_ids, delivery_item=item, status='in_store')
+    ProductUnit.objects.transition(
+        units.filter(request_item__isnull=False).values_list('pk', flat=True),
+        ['in_store'], 'in_request',
+        source=item,
+        delivery_item=None
+    )
+    # Удаление через QuerySet.delete: счётчики StockSummary и кэш серийных номеров
+    units.filter(request_item__isnull=True).delete()
+
+
+def receive_delivery_item(item, selected_units=None, batch_size=1000):
+    """
+    Приводит received_units позиции item к выбору selected_units
+    (None - выбор не менялся) и добирает единицы до quantity_received:
+    сначала из резерва позиции заявки, остальное - новыми единицами.
+    Возвращает список id единиц, привязанных в этот раз.
+    """
+    with transaction.atomic():
+        linked = set(item.received_units.values_list('pk', flat=True))
+        unlinked = set()
+        added = []
+
+        if selected_units is not None:
+            selected = {unit.pk for unit in selected_units}
+            unlinked = linked - selected
+            if unlinked:
+                ReceivedUnit.objects.filter(
+                    deliveryitem_id=item.pk, productunit_id__in=unlinked
+                ).delete()
+                release_units(item, unlinked)
+                linked -= unlinked
+            # Из заявки - только те, что ещё не приняты другой поставкой
+            added = ProductUnit.objects.transition(
+                sorted(selected - linked), ['in_request'], 'in_store',
+                source=item,
+                delivery_item=item
+            )
+
+        # Принятые позицией - не только связи received_units: единицы с
+        # delivery_item=item (в том числе без связи) и перенесённые в архив
+        received = set(ProductUnit.objects.filter(delivery_item=item).values_list('pk', flat=True))
+        # Непривязанные единицы позиции привязываем заново, кроме только что снятых
+        added += sorted(received - linked - set(added) - unlinked)
+        received |= linked | set(added)
+        archived = ProductUnitArchive.objects.filter(delivery_item=item).count()
+        shortfall = item.quantity_received - len(received) - archived
+        if shortfall > 0 and item.request_item_id:
+            # Резерв позиции заявки (RequestItem.sync_reserved_units), кроме только что снятых
+            reserved = list(
+                ProductUnit.objects.filter(
+                    request_item_id=item.request_item_id,
+                    product_id=item.product_id,
+                    status='in_request'
+                ).exclude(pk__in=unlinked).order_by('pk').values_list('pk', flat=True)[:shortfall]
+            )
+            moved = ProductUnit.objects.transition(
+                reserved, ['in_request'], 'in_store',
+                source=item,
+                delivery_item=item
+            )
+            added += moved
+            shortfall -= len(moved)
+
+        if shortfall > 0:
+            units = ProductUnit.objects.create_batch(
+                item.product,
+                shortfall,
+                batch_size=batch_size,
+                status='in_store',
+                request_item=item.request_item,
+                delivery_item=item,
+                source=item
+            )
+            added += [unit.pk for unit in units]
+
+        ReceivedUnit.objects.bulk_create(
+            [ReceivedUnit(deliveryitem_id=item.pk, productunit_id=unit_id) for unit_id in added],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+    return added